@@ -0,0 +1,6 @@
+"""DRL bus dispatching on the Addis Ababa SUMO scenario.
+
+Run the tools with ``python -m drl <command>``. Submodules are not imported
+here, so importing the package (or a light submodule such as
+``drl.check_actions``) never pulls in torch or TraCI.
+"""
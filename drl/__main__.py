@@ -0,0 +1,51 @@
+import importlib
+import os
+import sys
+
+# command -> (module, description). A command's module is imported only
+# when that command runs, so e.g. ``check-actions`` never loads torch.
+COMMANDS = {
+    "train": ("train", "Train the DQN dispatch agent"),
+    "evaluate": ("evaluate", "Run one greedy episode with a trained model"),
+    "check-actions": ("check_actions", "Print the discrete action table"),
+    "eval-sweep": ("eval_harness", "Evaluate policies over seeds x demand scenarios"),
+    "calibrate": ("calibrate", "Check the mesoscopic profile against a microscopic run"),
+    "schedule": ("schedule", "Compile GTFS frequencies into NumPy timetables"),
+    "benchmark": ("benchmark", "Benchmark TransitEnv and DQNAgent throughput"),
+    "plot": ("plot_results", "Plot episode rewards from a training log"),
+}
+
+
+def program_name():
+    """``python -m drl``, or the console script name when installed."""
+    if os.path.basename(sys.argv[0]) == "__main__.py":
+        return f"python -m {__package__}"
+    return os.path.basename(sys.argv[0])
+
+
+def print_usage(file=sys.stdout):
+    prog = program_name()
+    print(f"usage: {prog} <command> [options]\n\ncommands:", file=file)
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:<15} {description}", file=file)
+    print(f"\nRun '{prog} <command> --help' for a command's options.", file=file)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command!r}\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 2
+
+    module = importlib.import_module(f"{__package__}.{COMMANDS[command][0]}")
+    sys.argv[0] = f"{program_name()} {command}"  # argparse prog name
+    return module.main(rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
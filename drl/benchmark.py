@@ -0,0 +1,331 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from . import dispatch as dispatch_module
+from . import env as env_module
+from .check_actions import HOLD_ACTION
+from .fake_traci import FakeTraCI
+from .paths import OUTPUTS_DIR, SUMO_CFG
+from .replay_buffer import ReplayBuffer
+
+OUT_DIR = os.path.join(OUTPUTS_DIR, "benchmarks")
+
+# Modules whose ``traci`` global is swapped for the fake backend
+TRACI_USERS = [env_module, dispatch_module]
+
+STATE_DIM = 112
+ACTION_DIM = 27
+
+# (stops, vehicles, edges) for the get_state scaling sweep
+STATE_SIZES = [(15, 6, 500), (60, 24, 5000), (240, 96, 50000)]
+BUFFER_SIZES = [1000, 10000, 50000]
+BATCH_SIZES = [32, 64, 256]
+
+# Result name -> the --only group that produces it
+BENCH_GROUPS = {"env_reset": "reset", "env_step": "step", "get_state": "state",
+                "replay_sample": "replay", "train_step": "replay"}
+
+
+# ==========================
+# Helpers
+# ==========================
+def seed_everything(seed, with_torch):
+    random.seed(seed)
+    np.random.seed(seed)
+    if with_torch:
+        import torch
+        torch.manual_seed(seed)
+
+
+def sumo_available():
+    # TransitEnv.start runs the bare ``sumo`` binary, so only PATH counts
+    return shutil.which("sumo") is not None
+
+
+def sumo_version():
+    try:
+        out = subprocess.run(["sumo", "--version"], capture_output=True, text=True)
+        return out.stdout.splitlines()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def timed(fn, repeat):
+    """Median wall time of ``repeat`` calls to ``fn``, in seconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def make_env(backend, fake=None):
+    """Point the env modules at the requested TraCI backend and build a TransitEnv."""
+    sumo_args = []
+    if backend == "fake":
+        backend_module = fake or FakeTraCI()
+    else:
+        import traci as backend_module
+        # Discard the .sumocfg outputs (hundreds of MB of FCD per episode),
+        # so the timings measure the simulation rather than disk I/O
+        sumo_args = ["--tripinfo-output", os.devnull, "--fcd-output", os.devnull]
+    for module in TRACI_USERS:
+        module.traci = backend_module
+    return env_module.TransitEnv(SUMO_CFG, sumo_args=sumo_args)
+
+
+def result(name, params, metric, value, unit, higher_is_better):
+    return {
+        "name": name,
+        "params": params,
+        "metric": metric,
+        "value": value,
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+    }
+
+
+# ==========================
+# Benchmarks
+# ==========================
+def bench_reset(backend, repeat):
+    env = make_env(backend)
+    seconds = timed(env.reset, repeat)
+    if backend == "sumo":
+        env.close()
+    return [result("env_reset", {"backend": backend},
+                   "latency", seconds, "s", False)]
+
+
+def bench_steps(backend, num_steps):
+    fake = FakeTraCI() if backend == "fake" else None
+    env = make_env(backend, fake)
+    env.reset()
+
+    calls_before = fake.calls if fake else 0
+    t0 = time.perf_counter()
+    for _ in range(num_steps):
+        _, _, done = env.step(HOLD_ACTION)
+        if done:
+            env.reset()
+    seconds = time.perf_counter() - t0
+
+    results = [result("env_step", {"backend": backend, "steps": num_steps},
+                      "throughput", num_steps / seconds, "steps/s", True)]
+    if fake:
+        # Machine-independent: how many round-trips a real connection would make
+        results.append(result("env_step", {"backend": backend, "steps": num_steps},
+                              "traci_calls_per_step",
+                              (fake.calls - calls_before) / num_steps, "calls", False))
+    else:
+        env.close()
+    return results
+
+
+def bench_get_state(backend, repeat):
+    results = []
+    for stops, vehicles, edges in STATE_SIZES:
+        fake = FakeTraCI(num_stops=stops, num_vehicles=vehicles, num_edges=edges)
+        env = make_env("fake", fake)
+        env.reset()
+        params = {"backend": "fake", "stops": stops,
+                  "vehicles": vehicles, "edges": edges}
+
+        calls_before = fake.calls
+        seconds = timed(env.get_state, repeat)
+        results.append(result("get_state", params, "latency", seconds, "s", False))
+        results.append(result("get_state", params, "traci_calls",
+                              (fake.calls - calls_before) / repeat, "calls", False))
+
+    if backend == "sumo":
+        # One point at the real network's scale for reference
+        env = make_env("sumo")
+        env.reset()
+        import traci
+        params = {"backend": "sumo",
+                  "stops": len(traci.busstop.getIDList()),
+                  "vehicles": len(traci.vehicle.getIDList()),
+                  "edges": len(traci.edge.getIDList())}
+        seconds = timed(env.get_state, repeat)
+        results.append(result("get_state", params, "latency", seconds, "s", False))
+        env.close()
+    return results
+
+
+def bench_replay(repeat, seed):
+    # torch is only needed here; the env benchmarks skip its import cost
+    from .dqn_agent import DQNAgent
+
+    results = []
+    rng = np.random.default_rng(seed)
+    for capacity in BUFFER_SIZES:
+        agent = DQNAgent(state_dim=STATE_DIM, action_dim=ACTION_DIM)
+        agent.memory = ReplayBuffer(capacity=capacity)
+        for _ in range(capacity):
+            agent.store(rng.standard_normal(STATE_DIM).astype(np.float32),
+                        int(rng.integers(ACTION_DIM)),
+                        float(rng.standard_normal()),
+                        rng.standard_normal(STATE_DIM).astype(np.float32),
+                        bool(rng.random() < 0.01))
+
+        for batch_size in BATCH_SIZES:
+            agent.batch_size = batch_size
+            params = {"buffer": capacity, "batch": batch_size,
+                      "device": str(agent.device)}
+            sample_s = timed(lambda: agent.memory.sample(batch_size), repeat)
+            train_s = timed(agent.train, repeat)
+            results.append(result("replay_sample", params, "throughput",
+                                  1.0 / sample_s, "batches/s", True))
+            results.append(result("train_step", params, "throughput",
+                                  1.0 / train_s, "updates/s", True))
+    return results
+
+
+# ==========================
+# Baseline comparison
+# ==========================
+def result_key(r):
+    return (r["name"], r["metric"], json.dumps(r["params"], sort_keys=True))
+
+
+def compare(current, baseline, tolerance):
+    """Return (rows, regressions, missing).
+
+    ``rows`` covers results present in both runs; ``missing`` lists
+    baseline results the current run did not produce.
+    """
+    base = {result_key(r): r for r in baseline["results"]}
+    produced = {result_key(r) for r in current["results"]}
+    missing = [b for key, b in base.items() if key not in produced]
+    rows, regressions = [], []
+    for r in current["results"]:
+        b = base.get(result_key(r))
+        if b is None or not b["value"]:
+            continue
+        change = (r["value"] - b["value"]) / abs(b["value"])
+        worse = -change if r["higher_is_better"] else change
+        row = (r, b["value"], change, worse > tolerance)
+        rows.append(row)
+        if row[3]:
+            regressions.append(row)
+    return rows, regressions, missing
+
+
+def print_comparison(rows, tolerance):
+    print(f"\n{'Benchmark':<20} | {'Params':<48} | {'Metric':<20} | "
+          f"{'Baseline':>12} | {'Current':>12} | {'Change':>8}")
+    print("-" * 135)
+    for r, base_value, change, regressed in rows:
+        params = ",".join(f"{k}={v}" for k, v in r["params"].items())
+        flag = "  <-- REGRESSION" if regressed else ""
+        print(f"{r['name']:<20} | {params:<48} | {r['metric']:<20} | "
+              f"{base_value:>12.5g} | {r['value']:>12.5g} | {change:>+7.1%}{flag}")
+    print("-" * 135)
+    print(f"Tolerance: {tolerance:.0%}")
+
+
+# ==========================
+# Entry point
+# ==========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark TransitEnv and DQNAgent throughput.")
+    parser.add_argument("--backend", choices=["auto", "sumo", "fake"], default="auto",
+                        help="TraCI backend for reset/step benchmarks")
+    parser.add_argument("--only", nargs="+",
+                        choices=["reset", "step", "state", "replay"],
+                        default=["reset", "step", "state", "replay"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None,
+                        help="results file (default: outputs/benchmarks/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None,
+                        help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    backend = args.backend
+    if backend == "auto":
+        backend = "sumo" if sumo_available() else "fake"
+    with_torch = "replay" in args.only
+    seed_everything(args.seed, with_torch)
+    if with_torch:
+        import torch
+        torch.set_num_threads(1)  # keeps timings comparable across machines
+
+    results = []
+    if "reset" in args.only:
+        results += bench_reset(backend, max(1, args.repeat // 4))
+    if "step" in args.only:
+        results += bench_steps(backend, args.steps)
+    if "state" in args.only:
+        results += bench_get_state(backend, args.repeat)
+    if "replay" in args.only:
+        results += bench_replay(args.repeat, args.seed)
+
+    stamp = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": stamp.isoformat(),
+            "commit": git_commit(),
+            "backend": backend,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "torch": torch.__version__ if with_torch else None,
+            "sumo": sumo_version() if backend == "sumo" else None,
+        },
+        "results": results,
+    }
+
+    out = args.out or os.path.join(OUT_DIR, stamp.strftime("%Y%m%dT%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions, missing = compare(report, baseline, args.tolerance)
+        print_comparison(rows, args.tolerance)
+        # Benchmarks deselected with --only are not missing, just skipped
+        missing = [b for b in missing if BENCH_GROUPS.get(b["name"]) in args.only]
+        for b in missing:
+            params = ",".join(f"{k}={v}" for k, v in b["params"].items())
+            print(f"Missing from this run: {b['name']} {b['metric']} ({params})")
+        if regressions or missing:
+            print(f"❌ {len(regressions)} regression(s), {len(missing)} missing "
+                  f"result(s) against {args.baseline}")
+            return 1
+        print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
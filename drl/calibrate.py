@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import traci
+
+from .check_actions import HOLD_ACTION
+from .env import TransitEnv
+from .fidelity import FIDELITY_PROFILES
+from .paths import OUTPUTS_DIR, SUMO_CFG
+
+OUT_DIR = os.path.join(OUTPUTS_DIR, "calibration")
+
+
+def route_of(veh_id):
+    """Route id from a bus id: ``bus_<route>_<t>`` (env) or ``<route>.<n>`` (GTFS)."""
+    if veh_id.startswith("bus_"):
+        return veh_id.split("_")[1]
+    return veh_id.split(".")[0]
+
+
+def run_profile(sumo_cfg, fidelity, seed, out_dir):
+    """One episode under the hold policy; returns bus travel times and stop waiting counts."""
+    outputs = ["--tripinfo-output", os.path.join(out_dir, f"tripinfo_{fidelity}.xml")]
+    if FIDELITY_PROFILES[fidelity]["keep_outputs"]:
+        outputs += ["--fcd-output", os.devnull]
+    env = TransitEnv(sumo_cfg, seed=seed, label=f"calibrate_{fidelity}",
+                     sumo_args=outputs, fidelity=fidelity)
+
+    t0 = time.perf_counter()
+    state = env.reset()
+    sim_start = traci.simulation.getTime()
+    waiting = [env.raw_signals(state)["stop_waiting"]]
+    done = False
+    while not done:
+        state, _, done = env.step(HOLD_ACTION)
+        waiting.append(env.raw_signals(state)["stop_waiting"])
+    sim_seconds = traci.simulation.getTime() - sim_start
+    env.close()
+    wall = time.perf_counter() - t0
+
+    travel_times = {}
+    for trip in ET.parse(outputs[1]).getroot().iter("tripinfo"):
+        if trip.get("vType") == "bus":
+            travel_times.setdefault(route_of(trip.get("id")), []).append(
+                float(trip.get("duration")))
+
+    return {
+        "wall_s": wall,
+        "sim_hours_per_hour": sim_seconds / wall,
+        "bus_travel_time": {r: float(np.mean(t)) for r, t in sorted(travel_times.items())},
+        "stop_waiting": np.mean(waiting, axis=0).tolist(),
+    }
+
+
+def relative_error(value, reference):
+    return abs(value - reference) / max(abs(reference), 1e-9)
+
+
+def compare(micro, meso, tolerance):
+    checks = []
+    for route, reference in micro["bus_travel_time"].items():
+        if route in meso["bus_travel_time"]:
+            err = relative_error(meso["bus_travel_time"][route], reference)
+            checks.append({"check": f"bus_travel_time[{route}]", "micro": reference,
+                           "meso": meso["bus_travel_time"][route], "rel_error": err,
+                           "ok": err <= tolerance})
+        else:
+            checks.append({"check": f"bus_travel_time[{route}]", "micro": reference,
+                           "meso": None, "rel_error": None, "ok": False})
+
+    micro_wait = sum(micro["stop_waiting"])
+    meso_wait = sum(meso["stop_waiting"])
+    err = relative_error(meso_wait, micro_wait)
+    checks.append({"check": "corridor_waiting", "micro": micro_wait, "meso": meso_wait,
+                   "rel_error": err, "ok": err <= tolerance})
+
+    # Per stop: mean absolute error relative to the mean micro waiting count,
+    # so quiet stops with near-zero waiting don't dominate
+    micro_stops = np.asarray(micro["stop_waiting"])
+    meso_stops = np.asarray(meso["stop_waiting"])
+    mae = float(np.abs(meso_stops - micro_stops).mean())
+    err = mae / max(float(micro_stops.mean()), 1e-9)
+    checks.append({"check": "stop_waiting_nmae", "micro": float(micro_stops.mean()),
+                   "meso": float(meso_stops.mean()), "rel_error": err,
+                   "ok": err <= tolerance})
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check the mesoscopic profile against the microscopic run.")
+    parser.add_argument("--sumo-cfg", default=SUMO_CFG)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="max relative error of travel times, corridor and per-stop waiting")
+    parser.add_argument("--out", default=None,
+                        help="report file (default: outputs/calibration/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        micro = run_profile(args.sumo_cfg, "micro", args.seed, tmp)
+        meso = run_profile(args.sumo_cfg, "meso", args.seed, tmp)
+    checks = compare(micro, meso, args.tolerance)
+
+    print(f"\n{'Check':<24} | {'Micro':>10} | {'Meso':>10} | {'Rel. error':>10} | OK")
+    print("-" * 68)
+    for c in checks:
+        err = "-" if c["rel_error"] is None else f"{c['rel_error']:.1%}"
+        meso_value = "-" if c["meso"] is None else f"{c['meso']:.2f}"
+        print(f"{c['check']:<24} | {c['micro']:>10.2f} | {meso_value:>10} | "
+              f"{err:>10} | {'✅' if c['ok'] else '❌'}")
+    print("-" * 68)
+    speedup = meso["sim_hours_per_hour"] / micro["sim_hours_per_hour"]
+    print(f"Simulated hours per wall hour: micro {micro['sim_hours_per_hour']:.0f}, "
+          f"meso {meso['sim_hours_per_hour']:.0f} ({speedup:.1f}x)")
+
+    out = args.out or os.path.join(OUT_DIR, time.strftime("%Y%m%dT%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"seed": args.seed, "tolerance": args.tolerance,
+                   "micro": micro, "meso": meso, "checks": checks}, f, indent=2)
+    print(f"Report saved to {out}")
+    return 0 if all(c["ok"] for c in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,17 @@
+import argparse
+import sys
+
+# Defining the lists here ensures they are the source of truth for the env,
+# training and the evaluation baselines
+HEADWAY_OPTIONS = [-240, -180, -120, -60, 0, 60, 120, 180, 240]
+DWELL_OPTIONS = [0, 30, 60]
+
+# No headway shift, no dwell extension
+HOLD_ACTION = HEADWAY_OPTIONS.index(0) * 3 + DWELL_OPTIONS.index(0)
+
+
 def get_action_mapping():
-    # Defining the lists here ensures they are the source of truth
-    headway_options = [-240, -180, -120, -60, 0, 60, 120, 180, 240]
-    dwell_options = [0, 30, 60]
-    return headway_options, dwell_options
+    return HEADWAY_OPTIONS, DWELL_OPTIONS
 
 def print_action_table():
     headway_options, dwell_options = get_action_mapping()
@@ -14,14 +23,21 @@ def print_action_table():
     for i in range(num_actions):
         h_idx = i // 3
         d_idx = i % 3
-        
+
         h_val = headway_options[h_idx]
         d_val = dwell_options[d_idx]
-        
+
         print(f"{i:<10} | {h_val:<15} | {d_val:<15}")
-    
+
     print("-" * 45)
     print(f"Total Discrete Actions: {num_actions}")
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Print the discrete action table (headway shift x dwell extension).")
+    parser.parse_args(argv)
+    print_action_table()
+    return 0
+
 if __name__ == "__main__":
-    print_action_table()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import os
+import random
+import shutil
+import threading
+
+import numpy as np
+import torch
+
+from .replay_buffer import ReplayBuffer
+
+LATEST = "LATEST"
+
+
+def capture_rng_state():
+    state = {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def restore_rng_state(state):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+class Checkpointer:
+    """Full training-state checkpoints written off the training thread.
+
+    ``save`` snapshots the agent, optimizer, RNG states and replay buffer in
+    memory and returns; a background thread writes them to
+    ``<directory>/ep_XXXXX`` (replay arrays as memory-mappable ``.npy``
+    files, everything else in ``state.pt``). A checkpoint only becomes
+    visible once it is complete: it is written under a ``.tmp`` name, renamed
+    into place, and then ``LATEST`` is swapped to point at it.
+
+    Only the ``keep`` most recently written checkpoints are kept, by write
+    time rather than episode number, so a fresh run in a directory holding
+    later episodes from an older run never deletes its own checkpoints.
+    """
+
+    def __init__(self, directory, keep=2):
+        self.directory = directory
+        self.keep = keep
+        self._thread = None
+        self._error = None
+
+    # ==========================
+    # Saving
+    # ==========================
+    def save(self, agent, episode, recording=None):
+        """Snapshot ``agent``; ``recording`` is an EpisodeRecorder.mark()."""
+        # At most one write in flight; a new snapshot waits for the last one
+        self.wait()
+
+        payload = {
+            "agent": agent.state_dict(),
+            "rng": capture_rng_state(),
+            "episode": episode,
+            "recording": recording,
+        }
+        replay = agent.memory.snapshot()
+        payload["replay"] = {k: v for k, v in replay.items() if k != "arrays"}
+
+        self._thread = threading.Thread(
+            target=self._write, args=(payload, replay, episode),
+            name=f"checkpoint-ep{episode}", daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        """Block until the pending write is done; re-raise its error, if any."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Background checkpoint failed") from error
+
+    def _write(self, payload, replay, episode):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"ep_{episode:05d}"
+            final = os.path.join(self.directory, name)
+            tmp = final + ".tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+
+            torch.save(payload, os.path.join(tmp, "state.pt"))
+            # Policy weights alone, loadable by evaluate.py
+            torch.save(payload["agent"]["policy_net"], os.path.join(tmp, "policy.pth"))
+            ReplayBuffer.write_snapshot(replay, tmp)
+
+            shutil.rmtree(final, ignore_errors=True)
+            os.replace(tmp, final)
+            self._point_latest(name)
+            self._prune(name)
+        except Exception as e:  # surfaced on the training thread by wait()
+            self._error = e
+
+    def _point_latest(self, name):
+        tmp = os.path.join(self.directory, LATEST + ".tmp")
+        with open(tmp, "w") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.directory, LATEST))
+
+    def _prune(self, current):
+        # Oldest first; the checkpoint LATEST names is never a candidate
+        done = sorted((d for d in os.listdir(self.directory)
+                       if d.startswith("ep_") and not d.endswith(".tmp") and d != current),
+                      key=lambda d: os.stat(os.path.join(self.directory, d)).st_mtime_ns)
+        for old in done[:max(len(done) - (self.keep - 1), 0)]:
+            shutil.rmtree(os.path.join(self.directory, old), ignore_errors=True)
+
+    # ==========================
+    # Resuming
+    # ==========================
+    def latest(self):
+        path = os.path.join(self.directory, LATEST)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return os.path.join(self.directory, f.read().strip())
+
+    def load(self, agent, recorder=None):
+        """Restore the latest checkpoint into ``agent``.
+
+        Returns the episode to continue from, or ``None`` if there is no
+        checkpoint. Nothing is modified unless the whole checkpoint loads.
+        ``recorder`` is rolled back to the position saved with the
+        checkpoint, so replayed episodes are not recorded twice.
+        """
+        path = self.latest()
+        if path is None:
+            return None
+
+        # Our own file: it holds RNG states, so weights_only is not enough
+        payload = torch.load(os.path.join(path, "state.pt"),
+                             map_location="cpu", weights_only=False)
+        memory = ReplayBuffer()
+        memory.restore(payload["replay"], path)
+
+        agent.load_state_dict(payload["agent"])
+        agent.memory = memory
+        if recorder is not None and payload.get("recording") is not None:
+            recorder.rollback(payload["recording"])
+        restore_rng_state(payload["rng"])
+        return payload["episode"] + 1
@@ -0,0 +1,105 @@
+import os
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+import traci
+
+
+def read_route_stops(sumo_cfg):
+    """Route id -> stop ids, from the route files named in a .sumocfg.
+
+    Returns an empty dict if the config or its route files can't be read;
+    the executor then resolves stops through TraCI instead.
+    """
+    try:
+        cfg = ET.parse(sumo_cfg).getroot()
+        base = os.path.dirname(os.path.abspath(sumo_cfg))
+        files = cfg.find("input/route-files").get("value").split(",")
+        stops = {}
+        for name in files:
+            for route in ET.parse(os.path.join(base, name.strip())).getroot().iter("route"):
+                stops[route.get("id")] = [
+                    s.get("busStop") or s.get("trainStop") for s in route.findall("stop")
+                    if s.get("busStop") or s.get("trainStop")
+                ]
+        return stops
+    except (OSError, ET.ParseError, AttributeError):
+        return {}
+
+
+class DispatchExecutor:
+    """Inserts the buses a decision dispatches, applied once per env step.
+
+    The env queues at most one dispatch per decision (one route per
+    decision, alternating), so ``flush`` usually handles a single bus. Each
+    dispatch costs two TraCI calls: ``vehicle.add`` with ``line`` set, and
+    ``setBusStop`` for the dwell at the first stop, whose id comes from the
+    scenario's route files instead of a ``getStops`` query. Failures are
+    counted in ``stats`` instead of printed, and the last message per kind
+    is kept in ``last_error``; both cover the current episode.
+    """
+
+    def __init__(self, sumo_cfg, type_id="bus"):
+        self.type_id = type_id
+        self._file_stops = read_route_stops(sumo_cfg)
+        self.reset()
+
+    def reset(self):
+        """Start a new episode: clear queued work, TraCI-resolved stops and stats."""
+        self.route_stops = dict(self._file_stops)
+        self._dispatches = []
+        self.stats = Counter()
+        self.last_error = {}
+
+    # ==========================
+    # Queueing
+    # ==========================
+    def dispatch(self, veh_id, route_id, dwell):
+        """Queue a bus on ``route_id`` holding ``dwell`` s at its first stop."""
+        self._dispatches.append((veh_id, route_id, dwell))
+
+    # ==========================
+    # Applying
+    # ==========================
+    def flush(self):
+        """Apply everything queued; returns ``(veh_id, route_id)`` of buses inserted."""
+        dispatches, self._dispatches = self._dispatches, []
+
+        inserted, holds = [], []
+        for veh_id, route_id, dwell in dispatches:
+            try:
+                traci.vehicle.add(vehID=veh_id, routeID=route_id,
+                                  typeID=self.type_id, line=route_id)
+            except traci.TraCIException as e:
+                self._fail("dispatch_failed", f"{route_id}: {e}")
+                continue
+            self.stats["dispatched"] += 1
+            inserted.append((veh_id, route_id))
+
+            first_stop = self._first_stop(veh_id, route_id)
+            if first_stop is not None:
+                holds.append((veh_id, first_stop, dwell))
+
+        for veh_id, stop_id, duration in holds:
+            try:
+                traci.vehicle.setBusStop(vehID=veh_id, stopID=stop_id, duration=duration)
+                self.stats["dwell_set"] += 1
+            except traci.TraCIException as e:
+                self._fail("dwell_failed", f"{veh_id}@{stop_id}: {e}")
+        return inserted
+
+    def _first_stop(self, veh_id, route_id):
+        if route_id not in self.route_stops:
+            # Not in the route files: ask once per route per episode
+            try:
+                stops = traci.vehicle.getStops(veh_id)
+                self.route_stops[route_id] = [s.stoppingPlaceID for s in stops]
+            except traci.TraCIException as e:
+                self._fail("stops_unresolved", f"{route_id}: {e}")
+                return None
+        stops = self.route_stops[route_id]
+        return stops[0] if stops else None
+
+    def _fail(self, kind, message):
+        self.stats[kind] += 1
+        self.last_error[kind] = message
@@ -3,7 +3,7 @@ import torch.nn as nn
 import torch.optim as optim
 import numpy as np
 import random
-from replay_buffer import ReplayBuffer
+from .replay_buffer import ReplayBuffer
 
 class DQN(nn.Module):
     def __init__(self, state_dim = 112, action_dim = 27):
@@ -81,3 +81,34 @@ class DQNAgent:
 
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
+
+    # ==========================
+    # Checkpointing
+    # ==========================
+    def state_dict(self):
+        """Everything except the replay buffer, copied to CPU so it can be
+        serialised from another thread while training continues."""
+        def to_cpu(obj):
+            if torch.is_tensor(obj):
+                return obj.detach().to("cpu", copy=True)
+            if isinstance(obj, dict):
+                return {k: to_cpu(v) for k, v in obj.items()}
+            if isinstance(obj, list):
+                return [to_cpu(v) for v in obj]
+            return obj
+
+        return {
+            "policy_net": to_cpu(self.policy_net.state_dict()),
+            "target_net": to_cpu(self.target_net.state_dict()),
+            "optimizer": to_cpu(self.optimizer.state_dict()),
+            "epsilon": self.epsilon,
+            "step_count": self.step_count,
+        }
+
+    def load_state_dict(self, state):
+        self.policy_net.load_state_dict(state["policy_net"])
+        self.target_net.load_state_dict(state["target_net"])
+        # Optimizer.load_state_dict moves the state onto the params' device
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.epsilon = state["epsilon"]
+        self.step_count = state["step_count"]
@@ -1,11 +1,21 @@
 import traci
 import numpy as np
 
+from .check_actions import DWELL_OPTIONS, HEADWAY_OPTIONS
+from .dispatch import DispatchExecutor
+from .fidelity import FIDELITY_PROFILES, profile_config
+
 
 class TransitEnv:
 
-    def __init__(self, sumo_cfg):
+    def __init__(self, sumo_cfg, seed=None, label="default", sumo_args=(),
+                 fidelity="micro", timetable=None):
         self.sumo_cfg = sumo_cfg
+        self.seed = seed            # SUMO --seed; None keeps SUMO's default
+        self.label = label          # TraCI connection label, one per env
+        self.sumo_args = list(sumo_args)
+        self.fidelity = fidelity    # key of FIDELITY_PROFILES ("micro"/"meso")
+        self.timetable = timetable  # schedule.Timetable for real schedule features
         self.step_length = 60
         self.target_headway = 600  # 10 minutes
         self.last_dispatch_time = 0
@@ -19,22 +29,36 @@ class TransitEnv:
         self.direction_toggle = 0
         self.pending_delay = 0
 
+        # veh_id -> (route_id, dispatch_time, headway since the route's previous bus)
+        self.dispatch_log = {}
+        self.route_dispatch_times = {}
+        self.dispatcher = DispatchExecutor(sumo_cfg)
+        self.recorder = None        # recorder.EpisodeRecorder, see attach_recorder
+
     # ==========================
     # Simulation Control
     # ==========================
     def start(self):
         # This forces the simulation to stay open from 21590 to 30000 seconds
-        traci.start([
-            "sumo", "-c", self.sumo_cfg,
+        cmd = [
+            "sumo", "-c", profile_config(self.sumo_cfg, self.fidelity),
             "--begin", "21590",
             "--end", "30000",
-            "--waiting-time-memory", "1000" 
-        ])
+            "--waiting-time-memory", "1000"
+        ]
+        cmd += FIDELITY_PROFILES[self.fidelity]["sumo_args"]
+        if self.seed is not None:
+            cmd += ["--seed", str(self.seed)]
+        traci.start(cmd + self.sumo_args, label=self.label)
+
+    def activate(self):
+        """Make this env's connection current when several envs share a process."""
+        traci.switch(self.label)
 
     def close(self):
         """Cleanly shut down TraCI."""
         try:
-            import traci
+            self.activate()
             traci.close()
         except Exception as e:
             print(f"Error during TraCI closure: {e}")
@@ -42,6 +66,7 @@ class TransitEnv:
     
     def reset(self):
         try:
+            self.activate()
             traci.close()
         except:
             pass
@@ -54,13 +79,34 @@ class TransitEnv:
         self.last_dispatch_time = start_time
         self.direction_toggle = 0
         self.pending_delay = 0
-        return self.get_state()
+        self.dispatch_log = {}
+        self.route_dispatch_times = {}
+        self.dispatcher.reset()
+
+        state = self.get_state()
+        if self.recorder is not None:
+            self.recorder.begin_episode(state)
+        return state
+
+    def attach_recorder(self, recorder):
+        """Log every following reset/step to ``recorder`` (None to stop)."""
+        self.recorder = recorder
+
+    def raw_signals(self, state, current_time=None):
+        """Raw per-step signals kept alongside observations in recordings."""
+        return {
+            "sim_time": current_time,
+            "stop_waiting": state[0:self.max_stops * 4:4],          # waiting_count
+            "bus_positions": state[self.max_stops * 4 + 2:
+                                   self.max_stops * 4 + self.max_vehicles * 6:6],
+        }
 
     def step(self, action):
         self.apply_action(action)
 
-        for _ in range(self.step_length):
-            traci.simulationStep()
+        # One round-trip to advance a whole decision interval, whatever
+        # the SUMO step length of the active fidelity profile
+        traci.simulationStep(traci.simulation.getTime() + self.step_length)
 
         next_state = self.get_state()
         reward = self.compute_reward()
@@ -69,6 +115,9 @@ class TransitEnv:
         current_time = traci.simulation.getTime()
         done = current_time >= 28000 
 
+        if self.recorder is not None:
+            self.recorder.record(action, reward, next_state, done,
+                                 self.raw_signals(next_state, current_time))
         return next_state, reward, done
 
     # ==========================
@@ -148,16 +197,21 @@ class TransitEnv:
 
             # approximate distance to next stop
             try:
-                next_stop = traci.vehicle.getNextStops(veh)[0][0]
+                next_stop = traci.vehicle.getNextStops(veh)[0][2]
                 veh_pos = traci.vehicle.getLanePosition(veh)
                 distance = veh_pos
             except:
+                next_stop = None
                 distance = 0
 
-            schedule_dev = traci.simulation.getTime() - self.last_dispatch_time
+            now = traci.simulation.getTime()
             dwell = traci.vehicle.getAccumulatedWaitingTime(veh)
 
-            headway_dev = schedule_dev - self.target_headway
+            if self.timetable is not None and veh in self.dispatch_log:
+                schedule_dev, headway_dev = self.get_schedule_features(veh, next_stop, now)
+            else:
+                schedule_dev = now - self.last_dispatch_time
+                headway_dev = schedule_dev - self.target_headway
 
             features.extend([
                 load,
@@ -173,6 +227,30 @@ class TransitEnv:
 
         return np.array(features[:36])
 
+    def get_schedule_features(self, veh, next_stop, now):
+        """Schedule and headway deviation of a dispatched bus against the
+        compiled timetable; binary searches only, no extra TraCI calls."""
+        route_id, dispatched_at, headway = self.dispatch_log[veh]
+        if route_id not in self.timetable:
+            return now - dispatched_at, 0
+
+        # The planned trip this bus serves is the departure nearest its dispatch
+        planned_departure = self.timetable.nearest_departure(route_id, dispatched_at)
+        schedule_dev = dispatched_at - planned_departure
+        # gtfs2pt stop ids are "<route>.<n>", n being the GTFS stop index
+        suffix = next_stop.rpartition(".")[2] if next_stop else ""
+        if suffix.isdigit():
+            offsets = self.timetable.pattern_offsets(route_id)
+            if int(suffix) < len(offsets):
+                schedule_dev = now - (planned_departure + offsets[int(suffix)])
+
+        planned_headway = self.timetable.planned_headway(route_id, dispatched_at)
+        if headway is None or np.isnan(planned_headway):
+            headway_dev = 0
+        else:
+            headway_dev = headway - planned_headway
+        return schedule_dev, headway_dev
+
     # --------------------------
     # 3️⃣ NETWORK-LEVEL (16)
     # --------------------------
@@ -213,16 +291,15 @@ class TransitEnv:
     # ACTION
     # ==========================
     def apply_action(self, action):
-        # 1. Define the discrete action space (9 headway options x 3 dwell options = 27)
-        headway_options = [-240, -180, -120, -60, 0, 60, 120, 180, 240]
-        dwell_options = [0, 30, 60]
+        # 1. Discrete action space (9 headway options x 3 dwell options = 27),
+        #    defined in check_actions.py
 
         # 2. Decode the 27 actions (0-26)
         headway_idx = action // 3
         dwell_idx = action % 3
 
-        headway_shift = headway_options[headway_idx]
-        dwell_extension = dwell_options[dwell_idx]
+        headway_shift = HEADWAY_OPTIONS[headway_idx]
+        dwell_extension = DWELL_OPTIONS[dwell_idx]
 
         current_time = traci.simulation.getTime()
         dispatch_time = self.last_dispatch_time + self.target_headway + headway_shift
@@ -233,41 +310,21 @@ class TransitEnv:
             route_id = self.route_ids[self.direction_toggle]
             veh_id = f"bus_{route_id}_{int(current_time)}"
 
-            try:
-                # 4. Add the vehicle to the simulation
-                traci.vehicle.add(
-                    vehID=veh_id,
-                    routeID=route_id,
-                    typeID="bus"
-                )
-                
-                # 5. Set the 'line' attribute so passengers in passengers.add.xml board
-                traci.vehicle.setLine(veh_id, route_id)
-
-                # 6. Apply Dwell Extension to the first stop of the route
-                try:
-                    # FIXED: Use route.getStops to get actual BusStop IDs (e.g., "0.0") 
-                    # instead of lane IDs (e.g., "26006215#0_0")
-                    all_stops = traci.vehicle.getStops(veh_id)
-                    
-                    if all_stops:
-                        first_stop_id = all_stops[0].stoppingPlaceID
-                        
-                        # duration forces the bus to stay at the stop for at least this many seconds
-                        traci.vehicle.setBusStop(
-                            vehID=veh_id,
-                            stopID=first_stop_id,
-                            duration=dwell_extension
-                        )
-                except traci.TraCIException as stop_err:
-                    print(f"DEBUG: Dwell adjustment failed for {veh_id}: {stop_err}")
-
-                # 7. Update Environment State for toggling and headway tracking
+            # 4. Insert the bus (line set on insert, so passengers in
+            #    passengers.add.xml board) with its dwell extension at the
+            #    first stop. Failures are counted in self.dispatcher.stats,
+            #    per episode.
+            self.dispatcher.dispatch(veh_id, route_id, dwell_extension)
+
+            for veh_id, route_id in self.dispatcher.flush():
+                # 5. Update Environment State for toggling and headway tracking
+                previous = self.route_dispatch_times.get(route_id)
+                self.dispatch_log[veh_id] = (
+                    route_id, current_time,
+                    None if previous is None else current_time - previous)
+                self.route_dispatch_times[route_id] = current_time
                 self.last_dispatch_time = current_time
                 self.direction_toggle = 1 - self.direction_toggle
-                
-            except traci.TraCIException as dispatch_err:
-                print(f"DEBUG: Dispatch Error for Route {route_id}: {dispatch_err}")
 
     # ==========================
     # REWARD
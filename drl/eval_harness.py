@@ -0,0 +1,326 @@
+import argparse
+import csv
+import math
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .check_actions import DWELL_OPTIONS, HEADWAY_OPTIONS, HOLD_ACTION
+from .paths import MODEL_PATH, OUTPUTS_DIR, SUMO_CFG
+
+OUT_DIR = os.path.join(OUTPUTS_DIR, "eval")
+
+# Demand scenarios: name -> extra SUMO arguments
+SCENARIOS = {
+    "base": [],
+    "low": ["--scale", "0.7"],
+    "high": ["--scale", "1.3"],
+}
+
+# Two-sided 95% Student-t quantiles by degrees of freedom
+T_975 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447,
+         7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131,
+         20: 2.086, 25: 2.060, 30: 2.042}
+
+
+# ==========================
+# Policies
+# ==========================
+class FixedHeadwayPolicy:
+    """Baseline: the same headway shift and dwell extension at every decision."""
+
+    def __init__(self, shift=0, dwell=0):
+        if shift not in HEADWAY_OPTIONS or dwell not in DWELL_OPTIONS:
+            raise ValueError(f"shift must be one of {HEADWAY_OPTIONS} and dwell "
+                             f"one of {DWELL_OPTIONS}")
+        self.action = HEADWAY_OPTIONS.index(shift) * 3 + DWELL_OPTIONS.index(dwell)
+
+    def act_batch(self, states, envs):
+        return np.full(len(states), self.action, dtype=np.int64)
+
+
+class ScheduleDispatchPolicy:
+    """Baseline: pick the headway shift that lands the next dispatch closest
+    to the next planned GTFS departure of the route being served. Routes
+    without a timetable pattern (cropped or renamed scenarios) are held."""
+
+    def __init__(self, timetable_path=None):
+        from .schedule import TIMETABLE_PATH, Timetable
+
+        # Compiled once by main() before the pool starts
+        self.timetable = Timetable.load(timetable_path or TIMETABLE_PATH)
+
+    def act_batch(self, states, envs):
+        actions = []
+        for env in envs:
+            route_id = env.route_ids[env.direction_toggle]
+            if route_id not in self.timetable:
+                actions.append(HOLD_ACTION)
+                continue
+            earliest = env.last_dispatch_time + env.target_headway
+            planned = self.timetable.next_departure(route_id, env.last_dispatch_time + 1)
+            shift = min(HEADWAY_OPTIONS, key=lambda s: abs(earliest + s - planned))
+            actions.append(HEADWAY_OPTIONS.index(shift) * 3)
+        return np.array(actions, dtype=np.int64)
+
+
+class DQNPolicy:
+    """Greedy trained policy; one forward pass for all envs in a worker."""
+
+    def __init__(self, model_path):
+        import torch
+        from .dqn_agent import DQN
+
+        torch.set_num_threads(1)  # one SUMO + one policy per core
+        self.torch = torch
+        self.net = DQN()
+        self.net.load_state_dict(torch.load(model_path, map_location="cpu"))
+        self.net.eval()
+
+    def act_batch(self, states, envs):
+        with self.torch.no_grad():
+            q_values = self.net(self.torch.as_tensor(states, dtype=self.torch.float32))
+        return q_values.argmax(dim=1).numpy()
+
+
+def make_policy(spec):
+    """``fixed[:shift[:dwell]]``, ``schedule[:<timetable.npz>]`` or ``dqn:<model path>``."""
+    kind, _, rest = spec.partition(":")
+    if kind == "fixed":
+        parts = [int(p) for p in rest.split(":") if p]
+        return FixedHeadwayPolicy(*parts)
+    if kind == "schedule":
+        return ScheduleDispatchPolicy(rest or None)
+    if kind == "dqn":
+        return DQNPolicy(rest)
+    raise ValueError(f"Unknown policy spec: {spec!r}")
+
+
+# ==========================
+# Worker
+# ==========================
+def run_group(task):
+    """Run one policy on one scenario for several seeds, stepping the envs
+    in lockstep so each decision is a single batched policy call."""
+    from .env import TransitEnv
+    from .fidelity import FIDELITY_PROFILES
+    from .schedule import Timetable
+
+    policy = make_policy(task["policy"])
+    timetable = Timetable.load(task["timetable"]) if task["timetable"] else None
+    run_dir = task["run_dir"]
+    os.makedirs(run_dir, exist_ok=True)
+
+    envs = []
+    for seed in task["seeds"]:
+        tag = f"{task['scenario']}_{task['policy_tag']}_s{seed}"
+        # Per-run outputs so parallel SUMO instances never share a file
+        outputs = ["--tripinfo-output", os.path.join(run_dir, f"tripinfo_{tag}.xml")]
+        if FIDELITY_PROFILES[task["fidelity"]]["keep_outputs"]:
+            outputs += ["--fcd-output", os.devnull]
+        envs.append(TransitEnv(task["sumo_cfg"], seed=seed, label=tag,
+                               sumo_args=task["scenario_args"] + outputs,
+                               fidelity=task["fidelity"], timetable=timetable))
+
+    t0 = time.perf_counter()
+    # Per-run cost: the run's own SUMO time plus its share of each batched
+    # policy call, so wall_s does not scale with --envs-per-worker
+    run_time = [0.0] * len(envs)
+    states = []
+    for i, env in enumerate(envs):
+        t = time.perf_counter()
+        states.append(env.reset())
+        run_time[i] += time.perf_counter() - t
+    totals = [0.0] * len(envs)
+    waiting = [[] for _ in envs]
+    steps = [0] * len(envs)
+    active = list(range(len(envs)))
+
+    while active:
+        t = time.perf_counter()
+        actions = policy.act_batch(np.stack([states[i] for i in active]),
+                                   [envs[i] for i in active])
+        share = (time.perf_counter() - t) / len(active)
+        still_active = []
+        for i, action in zip(active, actions):
+            env = envs[i]
+            t = time.perf_counter()
+            env.activate()
+            states[i], reward, done = env.step(int(action))
+            run_time[i] += time.perf_counter() - t + share
+            totals[i] += reward
+            waiting[i].append(float(env.raw_signals(states[i])["stop_waiting"].sum()))
+            steps[i] += 1
+            if done:
+                env.close()
+            else:
+                still_active.append(i)
+        active = still_active
+    group_wall = time.perf_counter() - t0
+
+    return [{
+        "scenario": task["scenario"],
+        "policy": task["policy"],
+        "seed": seed,
+        "total_reward": totals[i],
+        "mean_waiting": float(np.mean(waiting[i])) if waiting[i] else 0.0,
+        "steps": steps[i],
+        "dispatched": envs[i].dispatcher.stats["dispatched"],
+        "dispatch_failed": envs[i].dispatcher.stats["dispatch_failed"],
+        "wall_s": run_time[i],
+        "group_wall_s": group_wall,
+    } for i, seed in enumerate(task["seeds"])]
+
+
+# ==========================
+# Aggregation
+# ==========================
+def t_quantile(df):
+    if df <= 0:
+        return float("nan")
+    known = [d for d in T_975 if d <= df]
+    return T_975[max(known)] if df <= 30 else 1.96
+
+
+def summarize(rows, metric):
+    groups = {}
+    for r in rows:
+        groups.setdefault((r["scenario"], r["policy"]), []).append(r[metric])
+
+    summary = []
+    for (scenario, policy), values in sorted(groups.items()):
+        n = len(values)
+        mean = statistics.fmean(values)
+        std = statistics.stdev(values) if n > 1 else 0.0
+        half = t_quantile(n - 1) * std / math.sqrt(n) if n > 1 else float("nan")
+        summary.append({"scenario": scenario, "policy": policy, "n": n,
+                        "mean": mean, "std": std,
+                        "ci_low": mean - half, "ci_high": mean + half})
+    return summary
+
+
+def print_summary(summary, metric):
+    print(f"\n{metric}: mean ± 95% CI")
+    print(f"{'Scenario':<10} | {'Policy':<36} | {'n':>3} | {'Mean':>10} | "
+          f"{'95% CI':>23} | {'Std':>8}")
+    print("-" * 105)
+    for s in summary:
+        ci = f"[{s['ci_low']:9.3f}, {s['ci_high']:9.3f}]"
+        print(f"{s['scenario']:<10} | {s['policy']:<36} | {s['n']:>3} | "
+              f"{s['mean']:>10.3f} | {ci:>23} | {s['std']:>8.3f}")
+    print("-" * 105)
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# ==========================
+# Entry point
+# ==========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluate policies over seeds x demand scenarios in parallel.")
+    parser.add_argument("--policies", nargs="+",
+                        default=[f"dqn:{MODEL_PATH}", "fixed", "fixed:-120",
+                                 "fixed:120", "schedule"],
+                        help="fixed[:shift[:dwell]], schedule[:<timetable.npz>] "
+                             "or dqn:<model path>")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS),
+                        choices=list(SCENARIOS))
+    parser.add_argument("--seeds", type=int, default=10, help="seeds per scenario")
+    parser.add_argument("--first-seed", type=int, default=1)
+    parser.add_argument("--envs-per-worker", type=int, default=2,
+                        help="seeds stepped together in one worker with batched inference")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--sumo-cfg", default=SUMO_CFG)
+    parser.add_argument("--fidelity", choices=["micro", "meso"], default="micro",
+                        help="meso for fast screening sweeps")
+    parser.add_argument("--timetable", metavar="NPZ",
+                        help="compiled timetable for the schedule features of the "
+                             "observation (use with models trained with --timetable)")
+    parser.add_argument("--out", default=OUT_DIR)
+    args = parser.parse_args(argv)
+
+    # A missing model would only surface once the pool is busy, and abort
+    # the whole sweep without writing any results
+    for policy in args.policies:
+        kind, _, rest = policy.partition(":")
+        if kind == "dqn" and not os.path.exists(rest):
+            print(f"Model file not found: {rest} (policy {policy})")
+            return 1
+
+    seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+    run_dir = os.path.abspath(os.path.join(args.out, time.strftime("%Y%m%dT%H%M%S")))
+    sumo_cfg = os.path.abspath(args.sumo_cfg)
+
+    # Compile (or refresh) every timetable once here rather than racing to
+    # write it from the workers
+    from .schedule import TIMETABLE_PATH, load_or_compile
+
+    timetable = os.path.abspath(args.timetable) if args.timetable else None
+    schedule_paths = {timetable} if timetable else set()
+    for policy in args.policies:
+        kind, _, rest = policy.partition(":")
+        if kind == "schedule":
+            schedule_paths.add(os.path.abspath(rest or TIMETABLE_PATH))
+    for path in schedule_paths:
+        load_or_compile(path)
+
+    # Build the cheap policies once here too: a bad spec (e.g. a shift not in
+    # HEADWAY_OPTIONS) would otherwise also fail inside the pool
+    for policy in args.policies:
+        if policy.partition(":")[0] == "dqn":
+            continue
+        try:
+            make_policy(policy)
+        except (ValueError, OSError) as e:
+            print(f"Invalid policy {policy}: {e}")
+            return 1
+
+    tasks = []
+    for scenario in args.scenarios:
+        for p, policy in enumerate(args.policies):
+            for i in range(0, len(seeds), args.envs_per_worker):
+                tasks.append({
+                    "scenario": scenario,
+                    "scenario_args": SCENARIOS[scenario],
+                    "policy": policy,
+                    "policy_tag": f"p{p}",
+                    "seeds": seeds[i:i + args.envs_per_worker],
+                    "sumo_cfg": sumo_cfg,
+                    "fidelity": args.fidelity,
+                    "timetable": timetable,
+                    "run_dir": run_dir,
+                })
+
+    total_runs = len(seeds) * len(args.scenarios) * len(args.policies)
+    print(f"Evaluating {total_runs} runs as {len(tasks)} tasks on {args.workers} workers...")
+    t0 = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_group, task) for task in tasks]
+        for future in as_completed(futures):
+            rows.extend(future.result())
+            print(f"  {len(rows)}/{total_runs} runs done")
+    print(f"Sweep finished in {time.perf_counter() - t0:.1f}s")
+
+    rows.sort(key=lambda r: (r["scenario"], r["policy"], r["seed"]))
+    write_csv(os.path.join(run_dir, "runs.csv"), rows)
+    for metric in ("total_reward", "mean_waiting"):
+        summary = summarize(rows, metric)
+        print_summary(summary, metric)
+        write_csv(os.path.join(run_dir, f"summary_{metric}.csv"), summary)
+    print(f"Results saved in {run_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,64 @@
-import torch
+import argparse
 import os
-from env import TransitEnv
-from dqn_agent import DQNAgent
+import sys
 
-# 1. Setup paths
-SUMO_CFG = "../sumo_files/simulation.sumocfg"
-MODEL_PATH = "../models/dqn_model.pth"
+from .paths import MODEL_PATH, SUMO_CFG
 
-# 2. Initialize Environment
-# Set GUI=True in your env.py start() if you want to watch it!
-env = TransitEnv(SUMO_CFG)
 
-# 3. Initialize Agent
-state_dim = 112
-action_dim = 27
-agent = DQNAgent(state_dim=state_dim, action_dim=action_dim)
+def main(argv=None):
+    # 1. Setup paths
+    parser = argparse.ArgumentParser(
+        description="Run one greedy evaluation episode with a trained model.")
+    parser.add_argument("--sumo-cfg", default=SUMO_CFG)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--fidelity", choices=["micro", "meso"], default="micro")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timetable", metavar="NPZ",
+                        help="compiled timetable, if the model was trained with one")
+    args = parser.parse_args(argv)
 
-# 4. Load the Trained Weights
-if os.path.exists(MODEL_PATH):
-    agent.policy_net.load_state_dict(torch.load(MODEL_PATH))
+    if not os.path.exists(args.model):
+        print(f"Model file not found: {args.model}")
+        return 1
+
+    import torch
+
+    from .dqn_agent import DQNAgent
+    from .env import TransitEnv
+    from .schedule import load_or_compile
+
+    # 2. Initialize Environment
+    # Set GUI=True in your env.py start() if you want to watch it!
+    timetable = load_or_compile(args.timetable) if args.timetable else None
+    env = TransitEnv(args.sumo_cfg, seed=args.seed, fidelity=args.fidelity,
+                     timetable=timetable)
+
+    # 3. Initialize Agent
+    state_dim = 112
+    action_dim = 27
+    agent = DQNAgent(state_dim=state_dim, action_dim=action_dim)
+
+    # 4. Load the Trained Weights
+    agent.policy_net.load_state_dict(torch.load(args.model, map_location=agent.device))
     agent.epsilon = 0.0  # Force agent to use learned policy only
-    print(f"Successfully loaded model from {MODEL_PATH}")
-else:
-    print("Model file not found!")
-    exit()
-
-# 5. Run Evaluation Loop
-env.start() # Change to env.start(gui=True) in env.py to watch
-state = env.reset()
-done = False
-total_reward = 0
-
-print("Running Evaluation Simulation...")
-while not done:
-    action = agent.select_action(state)
-    state, reward, done = env.step(action)
-    total_reward += reward
-
-print(f"Evaluation Complete. Total Reward: {total_reward:.3f}")
-env.close()
\ No newline at end of file
+    print(f"Successfully loaded model from {args.model}")
+
+    # 5. Run Evaluation Loop
+    env.start() # Change to env.start(gui=True) in env.py to watch
+    state = env.reset()
+    done = False
+    total_reward = 0
+
+    print("Running Evaluation Simulation...")
+    while not done:
+        action = agent.select_action(state)
+        state, reward, done = env.step(action)
+        total_reward += reward
+
+    print(f"Evaluation Complete. Total Reward: {total_reward:.3f}")
+    env.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
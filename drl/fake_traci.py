@@ -0,0 +1,182 @@
+import zlib
+from collections import namedtuple
+
+# Same exception type the env catches from the real client
+from traci.exceptions import TraCIException
+
+
+StopData = namedtuple("StopData", ["stoppingPlaceID", "duration"])
+
+
+class _Domain:
+    """Base for the fake TraCI domains; counts every call as one round-trip."""
+
+    def __init__(self, sim):
+        self._sim = sim
+
+    def _call(self):
+        self._sim.calls += 1
+
+
+class _Simulation(_Domain):
+    def getTime(self):
+        self._call()
+        return float(self._sim.time)
+
+
+class _BusStop(_Domain):
+    def getIDList(self):
+        self._call()
+        return self._sim.stop_ids
+
+    def getPersonCount(self, stop):
+        self._call()
+        return self._sim.waiting(stop)
+
+    def getPersonIDs(self, stop):
+        self._call()
+        return tuple(f"p_{stop}_{k}" for k in range(self._sim.waiting(stop)))
+
+    def getVehicleIDs(self, stop):
+        self._call()
+        idx = self._sim.stop_index[stop]
+        return self._sim.vehicle_ids[idx:idx + 1] if idx % 5 == 0 else ()
+
+
+class _Person(_Domain):
+    def getWaitingTime(self, person):
+        self._call()
+        return float(self._sim.jitter(person) * 300)
+
+
+class _Vehicle(_Domain):
+    def getIDList(self):
+        self._call()
+        return self._sim.vehicle_ids
+
+    def getPersonNumber(self, veh):
+        self._call()
+        return int(self._sim.jitter(veh) * 60)
+
+    def getSpeed(self, veh):
+        self._call()
+        return self._sim.jitter(veh) * 14.0
+
+    def getNextStops(self, veh):
+        self._call()
+        stop = self._sim.stop_ids[int(self._sim.jitter(veh) * len(self._sim.stop_ids))]
+        return [(stop + "_lane", 100.0, stop, 0, 10.0, -1.0)]
+
+    def getLanePosition(self, veh):
+        self._call()
+        return self._sim.jitter(veh) * 500.0
+
+    def getAccumulatedWaitingTime(self, veh):
+        self._call()
+        return self._sim.jitter(veh) * 120.0
+
+    def getCO2Emission(self, veh):
+        self._call()
+        return self._sim.jitter(veh) * 5000.0
+
+    def add(self, vehID, routeID, typeID="DEFAULT_VEHTYPE", **kwargs):
+        self._call()
+        if vehID in self._sim.stops_by_vehicle:
+            raise TraCIException(f"Vehicle '{vehID}' to add already exists.")
+        self._sim.stops_by_vehicle[vehID] = [
+            StopData(stop, 10.0) for stop in self._sim.route_stops(routeID)
+        ]
+        self._sim.vehicle_ids = self._sim.vehicle_ids + (vehID,)
+
+    def setLine(self, vehID, line):
+        self._call()
+
+    def getStops(self, vehID, limit=0):
+        self._call()
+        return self._sim.stops_by_vehicle.get(vehID, [])
+
+    def setBusStop(self, vehID, stopID, duration=-1073741824.0, **kwargs):
+        self._call()
+
+
+class _Edge(_Domain):
+    def getIDList(self):
+        self._call()
+        return self._sim.edge_ids
+
+    def getLastStepVehicleNumber(self, edge):
+        self._call()
+        return int(self._sim.jitter(edge) * 4)
+
+
+class FakeTraCI:
+    """Deterministic stand-in for the ``traci`` module.
+
+    Implements the subset of the client API that ``TransitEnv`` uses, with
+    values derived from a seeded hash of (id, sim time) so two runs with the
+    same seed and sizes see identical observations. ``calls`` counts the
+    round-trips a real connection would have made.
+    """
+
+    TraCIException = TraCIException
+
+    def __init__(self, num_stops=15, num_vehicles=6, num_edges=500,
+                 route_ids=("0", "1"), seed=0):
+        self.num_stops = num_stops
+        self.num_vehicles = num_vehicles
+        self.num_edges = num_edges
+        self.route_ids = tuple(route_ids)
+        self.seed = seed
+
+        self.simulation = _Simulation(self)
+        self.busstop = _BusStop(self)
+        self.person = _Person(self)
+        self.vehicle = _Vehicle(self)
+        self.edge = _Edge(self)
+
+        self.calls = 0
+        self._reset_world()
+
+    def _reset_world(self):
+        self.time = 0
+        self.stop_ids = tuple(
+            f"{self.route_ids[i % len(self.route_ids)]}.{i // len(self.route_ids)}"
+            for i in range(self.num_stops)
+        )
+        self.stop_index = {s: i for i, s in enumerate(self.stop_ids)}
+        self.vehicle_ids = tuple(f"bg_{i}" for i in range(self.num_vehicles))
+        self.edge_ids = tuple(f"e{i}" for i in range(self.num_edges))
+        self.stops_by_vehicle = {}
+
+    def route_stops(self, route_id):
+        return [s for s in self.stop_ids if s.split(".")[0] == route_id]
+
+    def jitter(self, key):
+        # Stable in [0, 1) for a given (seed, key, time); unlike hash() this
+        # does not depend on PYTHONHASHSEED, and it leaves global RNGs alone
+        return zlib.crc32(f"{self.seed}:{key}:{self.time}".encode()) / 2**32
+
+    def waiting(self, stop):
+        return int(self.jitter(stop) * 20)
+
+    # ==========================
+    # Connection control
+    # ==========================
+    def start(self, cmd, label="default", **kwargs):
+        self._reset_world()
+        begin = cmd[cmd.index("--begin") + 1] if "--begin" in cmd else 0
+        self.time = int(float(begin))
+        return 21, "FakeTraCI"
+
+    def close(self, wait=True):
+        pass
+
+    def switch(self, label):
+        pass
+
+    def simulationStep(self, step=0.0):
+        self.calls += 1
+        if step and step > self.time:
+            self.time = int(step)
+        elif not step:
+            self.time += 1
@@ -0,0 +1,11 @@
+import os
+
+# Default locations, resolved from the repository root so the tools work
+# from any working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUMO_CFG = os.path.join(ROOT, "sumo_files", "simulation.sumocfg")
+MODELS_DIR = os.path.join(ROOT, "models")
+MODEL_PATH = os.path.join(MODELS_DIR, "dqn_model.pth")
+OUTPUTS_DIR = os.path.join(ROOT, "outputs")
+DATA_DIR = os.path.join(ROOT, "data")
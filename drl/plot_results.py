@@ -1,7 +1,13 @@
-import matplotlib.pyplot as plt
+import argparse
+import os
 import re
+import sys
+
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "train_log.txt")
 
 def plot_rewards(log_file):
+    import matplotlib.pyplot as plt
+
     episodes = []
     rewards = []
     
@@ -31,10 +37,18 @@ def plot_rewards(log_file):
     plt.grid(True, linestyle='--', alpha=0.7)
     plt.show()
 
-if __name__ == "__main__":
-    # If you didn't save a log file, you can copy-paste your terminal 
-    # output into a file named 'train_log.txt'
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plot episode rewards from a training log.")
+    # If you didn't save a log file, you can copy-paste your terminal
+    # output into a file and pass it here
+    parser.add_argument("log_file", nargs="?", default=LOG_FILE)
+    args = parser.parse_args(argv)
     try:
-        plot_rewards('train_log.txt')
+        plot_rewards(args.log_file)
     except FileNotFoundError:
-        print("Please save your terminal output to 'train_log.txt' first!")
\ No newline at end of file
+        print(f"Please save your terminal output to '{args.log_file}' first!")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import glob
+import json
+import os
+
+import numpy as np
+
+META = "meta.json"
+MMAP_DIR = "mmap"
+
+
+class EpisodeRecorder:
+    """Records TransitEnv episodes into compressed chunks on disk.
+
+    Each step stores the observation the action was taken in, the action,
+    reward and done flag, plus raw signals (sim time, per-stop waiting
+    counts, bus lane positions). Rows are buffered in preallocated arrays
+    and written every ``chunk_size`` steps as ``chunk_XXXXX.npz``. The
+    observation after an episode's last step is stored once per episode,
+    so next observations never have to be duplicated.
+
+    With ``append=True`` an existing recording is continued: chunk and
+    episode numbering pick up from its ``meta.json``, and chunks written
+    after the last ``meta.json`` update (e.g. by a crash) are overwritten.
+    ``mark``/``rollback`` keep such a recording in step with training
+    checkpoints. Without them, the episode interrupted by a crash never
+    gets its final observation; TraceDataset drops its last recorded step
+    (see ``TraceDataset.valid``).
+    """
+
+    def __init__(self, directory, obs_dim=112, num_stops=15, num_vehicles=6,
+                 chunk_size=4096, append=False):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        existing = glob.glob(os.path.join(directory, "chunk_*.npz"))
+        if existing and not append:
+            raise FileExistsError(f"{directory} already holds a recording "
+                                  f"(pass append=True to continue it)")
+
+        self.fields = {
+            "obs": ((obs_dim,), np.float32),
+            "action": ((), np.int16),
+            "reward": ((), np.float32),
+            "done": ((), np.bool_),
+            "episode": ((), np.int32),
+            "sim_time": ((), np.float32),
+            "stop_waiting": ((num_stops,), np.float32),
+            "bus_positions": ((num_vehicles,), np.float32),
+        }
+        self._rows = {name: np.zeros((chunk_size,) + shape, dtype=dtype)
+                      for name, (shape, dtype) in self.fields.items()}
+        self._n = 0
+        self._ends = []            # (episode, obs after its last step)
+        self.num_chunks = 0
+        self.num_steps = 0
+        self.episode = -1
+        self._current_obs = None
+
+        meta_path = os.path.join(directory, META)
+        if append and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["fields"] != self._field_meta():
+                raise ValueError(f"{directory} was recorded with different fields")
+            self.num_chunks = meta["num_chunks"]
+            self.num_steps = meta["num_steps"]
+            self.episode = meta["num_episodes"] - 1
+
+    # ==========================
+    # Recording
+    # ==========================
+    def begin_episode(self, obs):
+        self._end_episode()
+        self.episode += 1
+        self._current_obs = np.asarray(obs, dtype=np.float32)
+
+    def record(self, action, reward, next_obs, done, raw):
+        i = self._n
+        rows = self._rows
+        rows["obs"][i] = self._current_obs
+        rows["action"][i] = action
+        rows["reward"][i] = reward
+        rows["done"][i] = done
+        rows["episode"][i] = self.episode
+        rows["sim_time"][i] = raw["sim_time"]
+        rows["stop_waiting"][i] = raw["stop_waiting"]
+        rows["bus_positions"][i] = raw["bus_positions"]
+        self._n += 1
+        self.num_steps += 1
+
+        self._current_obs = np.asarray(next_obs, dtype=np.float32)
+        if done:
+            self._end_episode()
+        if self._n == self.chunk_size:
+            self._write_chunk()
+
+    def _end_episode(self):
+        if self._current_obs is not None and self.episode >= 0:
+            self._ends.append((self.episode, self._current_obs))
+        self._current_obs = None
+
+    def _write_chunk(self):
+        if self._n == 0 and not self._ends:
+            return
+        arrays = {name: rows[:self._n] for name, rows in self._rows.items()}
+        arrays["end_episode"] = np.array([e for e, _ in self._ends], dtype=np.int32)
+        arrays["end_obs"] = np.array([o for _, o in self._ends], dtype=np.float32).reshape(
+            len(self._ends), *self.fields["obs"][0])
+        path = os.path.join(self.directory, f"chunk_{self.num_chunks:05d}.npz")
+        np.savez_compressed(path, **arrays)
+
+        self.num_chunks += 1
+        self._n = 0
+        self._ends = []
+        self._write_meta()
+
+    def _field_meta(self):
+        return {name: {"shape": list(shape), "dtype": np.dtype(dtype).str}
+                for name, (shape, dtype) in self.fields.items()}
+
+    def _write_meta(self):
+        meta = {
+            "num_chunks": self.num_chunks,
+            "num_steps": self.num_steps - self._n,
+            "num_episodes": self.episode + 1,
+            "fields": self._field_meta(),
+        }
+        tmp = os.path.join(self.directory, META + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.directory, META))
+
+    # ==========================
+    # Checkpoints
+    # ==========================
+    def mark(self):
+        """Flush buffered rows and return the position recorded so far.
+
+        Stored with a training checkpoint so that ``rollback`` can drop the
+        episodes a resumed run is about to replay.
+        """
+        self._write_chunk()
+        return {"num_chunks": self.num_chunks, "num_steps": self.num_steps,
+                "num_episodes": self.episode + 1}
+
+    def rollback(self, mark):
+        """Discard everything recorded after ``mark`` (see ``mark``).
+
+        Only for a recorder opened with ``append=True`` that has not
+        recorded anything yet. A recording that does not reach ``mark``
+        is left as it is.
+        """
+        if self.num_chunks < mark["num_chunks"]:
+            return
+        for i in range(mark["num_chunks"], self.num_chunks):
+            os.remove(os.path.join(self.directory, f"chunk_{i:05d}.npz"))
+        self.num_chunks = mark["num_chunks"]
+        self.num_steps = mark["num_steps"]
+        self.episode = mark["num_episodes"] - 1
+        # A later recording could reuse the same meta, so force TraceDataset
+        # to expand the chunks again
+        stamp = os.path.join(self.directory, MMAP_DIR, "source.json")
+        if os.path.exists(stamp):
+            os.remove(stamp)
+        self._write_meta()
+
+    def close(self):
+        """Write the partial chunk; an unfinished episode keeps its last obs."""
+        self._end_episode()
+        self._write_chunk()
+
+
+class TraceDataset:
+    """Memory-mapped view of an EpisodeRecorder directory.
+
+    On first use the compressed chunks are expanded once into one ``.npy``
+    per field under ``<directory>/mmap/``; after that opening the dataset
+    costs nothing and arrays are paged in on demand.
+
+    ``valid`` marks the rows that form a complete transition. Only the last
+    recorded step of an episode cut short by a crash (see EpisodeRecorder's
+    ``append``) is invalid: its next observation was never written.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META)) as f:
+            self.meta = json.load(f)
+        self._consolidate()
+
+        mmap_dir = os.path.join(directory, MMAP_DIR)
+        for name in list(self.meta["fields"]) + ["end_obs", "has_end"]:
+            setattr(self, name, np.load(os.path.join(mmap_dir, f"{name}.npy"), mmap_mode="r"))
+
+        episode = np.asarray(self.episode)
+        continues = np.zeros(len(episode), dtype=bool)
+        continues[:-1] = episode[1:] == episode[:-1]
+        self.valid = continues | self.has_end[episode]
+
+    def __len__(self):
+        return len(self.action)
+
+    def _consolidate(self):
+        mmap_dir = os.path.join(self.directory, MMAP_DIR)
+        stamp = os.path.join(mmap_dir, "source.json")
+        if os.path.exists(stamp) and os.path.exists(os.path.join(mmap_dir, "has_end.npy")):
+            with open(stamp) as f:
+                if json.load(f) == self.meta:
+                    return
+
+        chunks = [os.path.join(self.directory, f"chunk_{i:05d}.npz")
+                  for i in range(self.meta["num_chunks"])]
+        fields = self.meta["fields"]
+        n = self.meta["num_steps"]
+        os.makedirs(mmap_dir, exist_ok=True)
+        out = {name: np.lib.format.open_memmap(
+                   os.path.join(mmap_dir, f"{name}.npy"), mode="w+",
+                   dtype=np.dtype(spec["dtype"]), shape=(n, *spec["shape"]))
+               for name, spec in fields.items()}
+        end_obs = np.zeros((self.meta["num_episodes"], *fields["obs"]["shape"]),
+                           dtype=np.float32)
+        has_end = np.zeros(self.meta["num_episodes"], dtype=bool)
+
+        # One chunk in memory at a time
+        pos = 0
+        for path in chunks:
+            with np.load(path) as chunk:
+                rows = len(chunk["action"])
+                for name in fields:
+                    out[name][pos:pos + rows] = chunk[name]
+                end_obs[chunk["end_episode"]] = chunk["end_obs"]
+                has_end[chunk["end_episode"]] = True
+                pos += rows
+        for array in out.values():
+            array.flush()
+        np.save(os.path.join(mmap_dir, "end_obs.npy"), end_obs)
+        np.save(os.path.join(mmap_dir, "has_end.npy"), has_end)
+
+        with open(stamp, "w") as f:
+            json.dump(self.meta, f)
+
+    # ==========================
+    # Transitions
+    # ==========================
+    def transitions(self, idx):
+        """``(states, actions, rewards, next_states, dones)`` for row indices.
+
+        Rows that are not ``valid`` come back with a zero next state.
+        """
+        idx = np.asarray(idx)
+        nxt = np.minimum(idx + 1, len(self) - 1)
+        same_episode = (idx + 1 < len(self)) & (self.episode[nxt] == self.episode[idx])
+        next_states = np.where(same_episode[:, None], self.obs[nxt],
+                               self.end_obs[self.episode[idx]])
+        return (np.asarray(self.obs[idx]), self.action[idx].astype(np.int64),
+                np.asarray(self.reward[idx]), next_states,
+                self.done[idx].astype(np.float32))
+
+    def fill_replay_buffer(self, buffer, block=8192):
+        """Push every valid recorded transition into a ReplayBuffer, in order."""
+        rows = np.flatnonzero(self.valid)
+        for start in range(0, len(rows), block):
+            buffer.extend(*self.transitions(rows[start:start + block]))
+        return buffer
+
+    def iter_batches(self, batch_size, shuffle=True, seed=None):
+        """Minibatches for offline RL or behaviour cloning, one pass per call."""
+        order = np.flatnonzero(self.valid)
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(order), batch_size):
+            # Sorted indices read the memory map sequentially
+            yield self.transitions(np.sort(order[start:start + batch_size]))
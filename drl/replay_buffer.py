@@ -1,23 +1,109 @@
+import os
 import random
 import numpy as np
 
+FIELDS = ("states", "actions", "rewards", "next_states", "dones")
+
+
 class ReplayBuffer:
     def __init__(self, capacity=50000):
         self.capacity = capacity
-        self.buffer = []
         self.position = 0
+        self.size = 0
+
+        # Allocated on the first push, once the state shape is known
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+
+    def _allocate(self, state_shape):
+        self.states = np.zeros((self.capacity,) + state_shape, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity,) + state_shape, dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.float32)
 
     def push(self, state, action, reward, next_state, done):
-        if len(self.buffer) < self.capacity:
-            self.buffer.append(None)
+        if self.states is None:
+            self._allocate(np.shape(state))
+
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
 
-        self.buffer[self.position] = (state, action, reward, next_state, done)
         self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """Push a block of transitions at once (e.g. from recorded traces)."""
+        n = len(actions)
+        if n == 0:
+            return
+        if self.states is None:
+            self._allocate(np.shape(states)[1:])
+        if n > self.capacity:
+            # Only the newest ``capacity`` transitions would survive anyway
+            states, actions, rewards, next_states, dones = (
+                a[-self.capacity:] for a in (states, actions, rewards, next_states, dones))
+            n = self.capacity
+
+        idx = (self.position + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
 
     def sample(self, batch_size):
-        batch = random.sample(self.buffer, batch_size)
-        state, action, reward, next_state, done = map(np.array, zip(*batch))
-        return state, action, reward, next_state, done
+        idx = np.array(random.sample(range(self.size), batch_size))
+        return (self.states[idx], self.actions[idx], self.rewards[idx],
+                self.next_states[idx], self.dones[idx])
 
     def __len__(self):
-        return len(self.buffer)
+        return self.size
+
+    # ==========================
+    # Persistence
+    # ==========================
+    def snapshot(self):
+        """Copy of the filled part of the buffer, safe to write from another thread."""
+        arrays = {}
+        if self.states is not None:
+            arrays = {name: getattr(self, name)[:self.size].copy() for name in FIELDS}
+        return {"capacity": self.capacity, "position": self.position,
+                "size": self.size, "arrays": arrays}
+
+    @staticmethod
+    def write_snapshot(snapshot, directory):
+        """Write each array of a snapshot as a memory-mappable ``.npy`` file."""
+        for name, array in snapshot["arrays"].items():
+            out = np.lib.format.open_memmap(
+                os.path.join(directory, f"replay_{name}.npy"),
+                mode="w+", dtype=array.dtype, shape=array.shape)
+            out[:] = array
+            out.flush()
+            del out
+
+    def restore(self, meta, directory):
+        """Refill the buffer from ``write_snapshot`` output and its metadata."""
+        self.capacity = meta["capacity"]
+        self.position = meta["position"]
+        self.size = meta["size"]
+        self.states = None
+        if self.size == 0:
+            return
+
+        loaded = {name: np.load(os.path.join(directory, f"replay_{name}.npy"),
+                                mmap_mode="r")
+                  for name in FIELDS}
+        self._allocate(loaded["states"].shape[1:])
+        for name, array in loaded.items():
+            getattr(self, name)[:self.size] = array
@@ -0,0 +1,226 @@
+import argparse
+import csv
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+from .paths import DATA_DIR
+
+GTFS_DIR = os.path.join(DATA_DIR, "raw_gtfs")
+TIMETABLE_PATH = os.path.join(DATA_DIR, "timetable.npz")
+
+
+def parse_time(value):
+    """GTFS ``HH:MM:SS`` (hours may exceed 24) to seconds after midnight."""
+    h, m, s = value.strip().split(":")
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+class Timetable:
+    """Planned departures and stop arrivals per trip pattern, as NumPy arrays.
+
+    A pattern is a GTFS trip (one direction of one route, with its stop
+    sequence); its id is the GTFS ``trip_id``, which gtfs2pt also used as
+    the SUMO route id. Arrays are stored CSR-style: pattern ``p`` owns
+    ``departures[dep_ptr[p]:dep_ptr[p + 1]]`` (sorted) and
+    ``offsets[stop_ptr[p]:stop_ptr[p + 1]]`` (seconds from departure to
+    each stop, in stop order). All lookups are binary searches.
+    """
+
+    def __init__(self, pattern_ids, route_ids, dep_ptr, departures,
+                 stop_ptr, offsets, stop_ids):
+        self.pattern_ids = np.asarray(pattern_ids)
+        self.route_ids = np.asarray(route_ids)
+        self.dep_ptr = np.asarray(dep_ptr, dtype=np.int64)
+        self.departures = np.asarray(departures, dtype=np.float64)
+        self.stop_ptr = np.asarray(stop_ptr, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.stop_ids = np.asarray(stop_ids)
+        self.index = {str(p): i for i, p in enumerate(self.pattern_ids)}
+
+        # Every departure of every pattern in one sorted array, for
+        # city-scale "what is due now" queries
+        owner = np.repeat(np.arange(len(self.pattern_ids)), np.diff(self.dep_ptr))
+        order = np.argsort(self.departures, kind="stable")
+        self.all_departures = self.departures[order]
+        self.all_patterns = owner[order]
+
+    # ==========================
+    # Per-pattern views
+    # ==========================
+    def __contains__(self, pattern):
+        return str(pattern) in self.index
+
+    def pattern_departures(self, pattern):
+        p = self.index[str(pattern)]
+        return self.departures[self.dep_ptr[p]:self.dep_ptr[p + 1]]
+
+    def pattern_offsets(self, pattern):
+        p = self.index[str(pattern)]
+        return self.offsets[self.stop_ptr[p]:self.stop_ptr[p + 1]]
+
+    def stop_arrivals(self, pattern):
+        """(departures, stops) matrix of planned arrival times."""
+        return self.pattern_departures(pattern)[:, None] + self.pattern_offsets(pattern)[None, :]
+
+    # ==========================
+    # Lookups, O(log n)
+    # ==========================
+    def next_departure(self, pattern, t):
+        """First planned departure at or after ``t`` (inf if none)."""
+        dep = self.pattern_departures(pattern)
+        i = np.searchsorted(dep, t, side="left")
+        return dep[i] if i < len(dep) else np.inf
+
+    def nearest_departure(self, pattern, t):
+        """Planned departure closest to ``t``: the trip a bus sent at ``t`` serves."""
+        dep = self.pattern_departures(pattern)
+        if len(dep) == 0:
+            return np.nan
+        i = np.searchsorted(dep, t)
+        if i == 0:
+            return dep[0]
+        if i == len(dep):
+            return dep[-1]
+        return dep[i] if dep[i] - t < t - dep[i - 1] else dep[i - 1]
+
+    def next_arrival(self, pattern, stop_index, t):
+        """First planned arrival at the pattern's ``stop_index``-th stop at or after ``t``."""
+        offset = self.pattern_offsets(pattern)[stop_index]
+        return self.next_departure(pattern, t - offset) + offset
+
+    def planned_headway(self, pattern, t):
+        """Gap between the planned departures around ``t``."""
+        dep = self.pattern_departures(pattern)
+        if len(dep) < 2:
+            return np.nan
+        i = int(np.clip(np.searchsorted(dep, t, side="right"), 1, len(dep) - 1))
+        return dep[i] - dep[i - 1]
+
+    def due(self, t0, t1):
+        """All planned departures in ``[t0, t1)`` across every pattern.
+
+        Returns ``(pattern_ids, times)``; this is what a rule-based
+        dispatcher needs per decision, for the whole city at once.
+        """
+        lo, hi = np.searchsorted(self.all_departures, [t0, t1], side="left")
+        return self.pattern_ids[self.all_patterns[lo:hi]], self.all_departures[lo:hi]
+
+    # ==========================
+    # Persistence
+    # ==========================
+    def save(self, path):
+        """Write atomically, so a concurrent ``load`` never sees a partial zip."""
+        # The .npz suffix stops savez from appending one to the temp name
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, pattern_ids=self.pattern_ids, route_ids=self.route_ids,
+                            dep_ptr=self.dep_ptr, departures=self.departures,
+                            stop_ptr=self.stop_ptr, offsets=self.offsets,
+                            stop_ids=self.stop_ids)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{k: data[k] for k in data.files})
+
+
+def compile_gtfs(gtfs_dir=GTFS_DIR):
+    """Expand ``frequencies.txt`` and ``stop_times.txt`` into a Timetable.
+
+    Trips listed in ``frequencies.txt`` run every ``headway_secs`` from
+    ``start_time`` (inclusive) to ``end_time`` (exclusive); other trips run
+    once, at their first ``stop_times`` departure.
+    """
+    trips = read_csv(os.path.join(gtfs_dir, "trips.txt"))
+
+    stop_rows = defaultdict(list)
+    for row in read_csv(os.path.join(gtfs_dir, "stop_times.txt")):
+        stop_rows[row["trip_id"]].append(row)
+
+    windows = defaultdict(list)
+    freq_path = os.path.join(gtfs_dir, "frequencies.txt")
+    if os.path.exists(freq_path):
+        for row in read_csv(freq_path):
+            windows[row["trip_id"]].append((parse_time(row["start_time"]),
+                                            parse_time(row["end_time"]),
+                                            int(row["headway_secs"])))
+
+    pattern_ids, route_ids = [], []
+    dep_ptr, stop_ptr = [0], [0]
+    departures, offsets, stop_ids = [], [], []
+    for trip in trips:
+        rows = sorted(stop_rows.get(trip["trip_id"], []),
+                      key=lambda r: int(r["stop_sequence"]))
+        if not rows:
+            continue
+        first = parse_time(rows[0]["departure_time"] or rows[0]["arrival_time"])
+        # Blank times (untimed stops) inherit the previous stop's time
+        times, last = [], first
+        for r in rows:
+            value = r["arrival_time"] or r["departure_time"]
+            last = parse_time(value) if value else last
+            times.append(last - first)
+
+        if trip["trip_id"] in windows:
+            dep = np.concatenate([np.arange(start, end, headway)
+                                  for start, end, headway in windows[trip["trip_id"]]])
+        else:
+            dep = np.array([first])
+
+        pattern_ids.append(trip["trip_id"])
+        route_ids.append(trip["route_id"])
+        departures.append(np.sort(dep))
+        dep_ptr.append(dep_ptr[-1] + len(dep))
+        offsets.extend(times)
+        stop_ids.extend(r["stop_id"] for r in rows)
+        stop_ptr.append(stop_ptr[-1] + len(rows))
+
+    return Timetable(pattern_ids, route_ids, dep_ptr,
+                     np.concatenate(departures) if departures else [],
+                     stop_ptr, offsets, stop_ids)
+
+
+def load_or_compile(path=TIMETABLE_PATH, gtfs_dir=GTFS_DIR):
+    """Reuse the compiled timetable unless the GTFS feed is newer."""
+    sources = [os.path.join(gtfs_dir, f)
+               for f in ("trips.txt", "stop_times.txt", "frequencies.txt")]
+    newest = max(os.path.getmtime(s) for s in sources if os.path.exists(s))
+    if os.path.exists(path) and os.path.getmtime(path) >= newest:
+        return Timetable.load(path)
+    timetable = compile_gtfs(gtfs_dir)
+    timetable.save(path)
+    return timetable
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compile GTFS frequencies and stop times into NumPy timetables.")
+    parser.add_argument("--gtfs", default=GTFS_DIR)
+    parser.add_argument("--out", default=TIMETABLE_PATH)
+    args = parser.parse_args(argv)
+
+    timetable = compile_gtfs(args.gtfs)
+    timetable.save(args.out)
+    print(f"Patterns: {len(timetable.pattern_ids)} | "
+          f"Routes: {len(set(timetable.route_ids.tolist()))} | "
+          f"Planned departures: {len(timetable.departures)} | "
+          f"Pattern stops: {len(timetable.offsets)}")
+
+    # Dispatches due per hour across the city over the morning peak
+    for hour in range(6, 10):
+        patterns, _ = timetable.due(hour * 3600, (hour + 1) * 3600)
+        print(f"  {hour:02d}:00-{hour + 1:02d}:00  {len(patterns):5d} dispatches due")
+    print(f"✅ Timetable saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,15 @@
-from env import TransitEnv
-from dqn_agent import DQNAgent
-import torch
+import argparse
 import os
+import sys
+
+from .check_actions import get_action_mapping
+from .paths import MODELS_DIR, SUMO_CFG
 
 # --- 0. SANITY CHECK FUNCTION ---
 def verify_action_mapping():
     """Verifies that the 27 discrete actions map correctly to Headway and Dwell."""
-    headway_options = [-240, -180, -120, -60, 0, 60, 120, 180, 240]
-    dwell_options = [0, 30, 60]
-    
+    headway_options, dwell_options = get_action_mapping()
+
     print("\n--- Action Space Sanity Check ---")
     # Test a few key indices
     test_cases = [0, 13, 26] # Start, Middle, End
@@ -16,64 +17,150 @@ def verify_action_mapping():
         h_idx = i // 3
         d_idx = i % 3
         print(f"Action ID {i:2}: Headway Shift {headway_options[h_idx]:4}s, Dwell Extension {dwell_options[d_idx]:2}s")
-    
+
     expected_dim = len(headway_options) * len(dwell_options)
     print(f"✅ Sanity Check Passed: {expected_dim} total actions verified.\n")
     return expected_dim
 
-# Ensure the models directory exists
-if not os.path.exists("../models"):
-    os.makedirs("../models")
-
-SUMO_CFG = "../sumo_files/simulation.sumocfg"
-
-# --- 1. CONFIGURATION ---
-# Run sanity check and get the dimension
-action_dim = verify_action_mapping() 
-state_dim = 112
-
-# --- 2. INITIALIZE ---
-env = TransitEnv(SUMO_CFG)
-agent = DQNAgent(state_dim=state_dim, action_dim=action_dim)
-
-# Start TraCI
-env.start()
-
-# Sanity check for dimensions
-initial_state = env.get_state()
-print(f"Verified State Shape: {initial_state.shape}") 
-print(f"Verified Action Space: {action_dim}")
-print("--- Starting Training ---\n")
-
-# --- 3. TRAINING LOOP ---
-episodes = 100
-for ep in range(episodes):
-    state = env.reset()
-    done = False
-    total_reward = 0
-
-    while not done:
-        # Agent selects an action (0-26)
-        action = agent.select_action(state)
-        
-        # Environment applies action and returns results
-        next_state, reward, done = env.step(action)
-
-        # Store experience and train
-        agent.store(state, action, reward, next_state, done)
-        agent.train()
-
-        # Update state and accumulate reward
-        state = next_state
-        total_reward += reward
-
-    # Log progress at the end of each episode
-    print(f"Episode {ep:3} | Reward: {total_reward:10.3f} | Epsilon: {agent.epsilon:.3f}")
-
-    # Optional: Save checkpoint every 10 episodes
-    if ep % 10 == 0:
-        torch.save(agent.policy_net.state_dict(), f"../models/dqn_checkpoint_ep{ep}.pth")
-
-# --- 4. SAVE FINAL MODEL ---
-torch.save(agent.policy_net.state_dict(), "../models/dqn_model.pth")
-print("\nTraining Complete. Final Model Saved at ../models/dqn_model.pth")
\ No newline at end of file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the DQN dispatch agent.")
+    parser.add_argument("--sumo-cfg", default=SUMO_CFG)
+    parser.add_argument("--fidelity", choices=["micro", "meso"], default="micro")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--timetable", metavar="NPZ",
+                        help="compiled GTFS timetable (compiled from data/raw_gtfs if "
+                             "missing or stale) for real schedule and headway features")
+    parser.add_argument("--models-dir", default=MODELS_DIR,
+                        help="where the final model and checkpoints/ are written")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the latest checkpoint in <models-dir>/checkpoints")
+    parser.add_argument("--checkpoint-every", type=int, default=10,
+                        help="episodes between full training-state checkpoints "
+                             "(0 disables them)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="record every episode's trace to DIR for offline reuse "
+                             "(with --resume, an existing recording is continued)")
+    parser.add_argument("--prefill", metavar="DIR", nargs="+", default=[],
+                        help="recorded trace directories to load into the replay buffer "
+                             "(ignored when --resume restores a checkpoint)")
+    args = parser.parse_args(argv)
+    if args.checkpoint_every < 0:
+        parser.error("--checkpoint-every must be 0 (disabled) or a positive episode count")
+
+    # Heavy imports (torch, TraCI) only once we are actually training
+    import torch
+
+    from .checkpoint import Checkpointer
+    from .dqn_agent import DQNAgent
+    from .env import TransitEnv
+    from .recorder import EpisodeRecorder, TraceDataset
+    from .schedule import load_or_compile
+
+    # Ensure the models directory exists
+    os.makedirs(args.models_dir, exist_ok=True)
+    checkpoint_dir = os.path.join(args.models_dir, "checkpoints")
+    model_path = os.path.join(args.models_dir, "dqn_model.pth")
+
+    # --- 1. CONFIGURATION ---
+    # Run sanity check and get the dimension
+    action_dim = verify_action_mapping()
+    state_dim = 112
+
+    # --- 2. INITIALIZE ---
+    timetable = load_or_compile(args.timetable) if args.timetable else None
+    env = TransitEnv(args.sumo_cfg, fidelity=args.fidelity, timetable=timetable)
+    agent = DQNAgent(state_dim=state_dim, action_dim=action_dim)
+    checkpointer = Checkpointer(checkpoint_dir)
+
+    recorder = None
+    if args.record:
+        recorder = EpisodeRecorder(args.record, append=args.resume)
+        env.attach_recorder(recorder)
+
+    start_ep = 0
+    resumed_ep = None
+    if args.resume:
+        # Restores nets, optimizer, epsilon, step count, RNGs and the replay
+        # buffer, so training picks up without refilling the buffer from scratch.
+        # The recording is rolled back to the checkpoint too
+        resumed_ep = checkpointer.load(agent, recorder=recorder)
+        if resumed_ep is None:
+            print(f"No checkpoint found in {checkpoint_dir}, starting fresh.")
+        else:
+            start_ep = resumed_ep
+            print(f"Resumed from {checkpointer.latest()} "
+                  f"(episode {start_ep}, {len(agent.memory)} transitions, "
+                  f"epsilon {agent.epsilon:.3f})")
+
+    if resumed_ep is not None and args.prefill:
+        # The restored buffer already holds whatever was prefilled before
+        print("Resumed replay buffer is kept as is, ignoring --prefill.")
+    else:
+        for trace_dir in args.prefill:
+            TraceDataset(trace_dir).fill_replay_buffer(agent.memory)
+            print(f"Prefilled replay buffer from {trace_dir} "
+                  f"({len(agent.memory)} transitions)")
+
+    # Start TraCI
+    env.start()
+
+    # Sanity check for dimensions
+    initial_state = env.get_state()
+    print(f"Verified State Shape: {initial_state.shape}")
+    print(f"Verified Action Space: {action_dim}")
+    print("--- Starting Training ---\n")
+
+    # --- 3. TRAINING LOOP ---
+    # On a crash or Ctrl-C the finally block still flushes the partial
+    # trace chunk and joins the checkpoint thread, so --resume --record
+    # can carry on from there
+    completed = False
+    try:
+        for ep in range(start_ep, args.episodes):
+            state = env.reset()
+            done = False
+            total_reward = 0
+
+            while not done:
+                # Agent selects an action (0-26)
+                action = agent.select_action(state)
+
+                # Environment applies action and returns results
+                next_state, reward, done = env.step(action)
+
+                # Store experience and train
+                agent.store(state, action, reward, next_state, done)
+                agent.train()
+
+                # Update state and accumulate reward
+                state = next_state
+                total_reward += reward
+
+            # Log progress at the end of each episode
+            print(f"Episode {ep:3} | Reward: {total_reward:10.3f} | Epsilon: {agent.epsilon:.3f}")
+
+            # Full training-state checkpoint, written in the background
+            if args.checkpoint_every and ep % args.checkpoint_every == 0:
+                recording = recorder.mark() if recorder is not None else None
+                checkpointer.save(agent, ep, recording=recording)
+        completed = True
+    finally:
+        if recorder is not None:
+            recorder.close()
+        try:
+            checkpointer.wait()
+        except RuntimeError as e:
+            # Don't mask the exception that stopped training
+            if completed:
+                raise
+            print(f"{e}: {e.__cause__!r}")
+
+    # --- 4. SAVE FINAL MODEL ---
+    torch.save(agent.policy_net.state_dict(), model_path)
+    print(f"\nTraining Complete. Final Model Saved at {model_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+SUMO_CFG = ROOT / "sumo_files" / "simulation.sumocfg"
+CACHE_DIR = ROOT / "sumo_files" / "cropped"
+
+# -----------------------------
+# DEFAULTS (edit if needed)
+# -----------------------------
+# SUMO route ids ("0") or GTFS short names ("AB097")
+DEFAULT_ROUTES = ["0", "1"]
+DEFAULT_BUFFER_M = 200.0
+
+
+# --------------------------------------------------
+# Reading the source scenario
+# --------------------------------------------------
+def read_config(cfg):
+    """Input files of a .sumocfg, resolved relative to the config."""
+    root = ET.parse(cfg).getroot()
+    base = cfg.parent
+
+    def files(tag):
+        el = root.find(f"input/{tag}")
+        if el is None:
+            return []
+        return [base / p.strip() for p in el.get("value").split(",") if p.strip()]
+
+    return root, files("net-file")[0], files("route-files"), files("additional-files")
+
+
+def resolve_routes(route_files, wanted):
+    """Map SUMO route ids or GTFS short names to SUMO route ids."""
+    by_name = {}
+    route_ids = set()
+    for path in route_files:
+        for el in ET.parse(path).getroot():
+            if el.tag == "route":
+                route_ids.add(el.get("id"))
+            elif el.tag == "vehicle" and el.get("route"):
+                for param in el.iter("param"):
+                    if param.get("key") == "gtfs.route_name":
+                        by_name.setdefault(param.get("value"), set()).add(el.get("route"))
+
+    selected = set()
+    for token in wanted:
+        if token in route_ids:
+            selected.add(token)
+        elif token in by_name:
+            selected |= by_name[token]
+        else:
+            raise SystemExit(f"Unknown route {token!r}: not a route id or GTFS route name")
+    return selected
+
+
+def read_edge_shapes(net_file):
+    """Non-internal edge id -> (N, 2) array of its first lane's shape."""
+    shapes = {}
+    for _, el in ET.iterparse(net_file):
+        if el.tag == "edge":
+            if el.get("function") != "internal":
+                lane = el.find("lane")
+                if lane is not None:
+                    pts = [tuple(map(float, p.split(","))) for p in lane.get("shape").split()]
+                    shapes[el.get("id")] = np.array(pts)[:, :2]
+            el.clear()
+    return shapes
+
+
+def densify(points, step):
+    """Points along a polyline, at most ``step`` metres apart."""
+    out = [points[:1]]
+    for a, b in zip(points[:-1], points[1:]):
+        n = max(1, int(np.ceil(np.linalg.norm(b - a) / step)))
+        out.append(a + (b - a) * (np.arange(1, n + 1)[:, None] / n))
+    return np.vstack(out)
+
+
+# --------------------------------------------------
+# Choosing the corridor
+# --------------------------------------------------
+def corridor_edges(shapes, route_edges, buffer_m):
+    """Route edges plus every edge that comes within ``buffer_m`` of them."""
+    step = max(buffer_m / 2, 10.0)
+    route_pts = np.vstack([densify(shapes[e], step) for e in route_edges if e in shapes])
+
+    edge_ids = list(shapes)
+    edge_pts = [densify(shapes[e], step) for e in edge_ids]
+    owner = np.repeat(np.arange(len(edge_ids)), [len(p) for p in edge_pts])
+    edge_pts = np.vstack(edge_pts)
+
+    # Coarse bounding-box filter first, then exact point distances in chunks
+    lo = route_pts.min(axis=0) - buffer_m
+    hi = route_pts.max(axis=0) + buffer_m
+    inside = np.all((edge_pts >= lo) & (edge_pts <= hi), axis=1)
+    cand_pts, cand_owner = edge_pts[inside], owner[inside]
+
+    near = np.zeros(len(cand_pts), dtype=bool)
+    for i in range(0, len(cand_pts), 4096):
+        chunk = cand_pts[i:i + 4096]
+        d2 = ((chunk[:, None, :] - route_pts[None, :, :]) ** 2).sum(axis=2)
+        near[i:i + 4096] = d2.min(axis=1) <= buffer_m ** 2
+
+    keep = {edge_ids[j] for j in np.unique(cand_owner[near])}
+    return keep | set(route_edges)
+
+
+def lane_edge(lane_id):
+    return lane_id.rsplit("_", 1)[0]
+
+
+# --------------------------------------------------
+# Writing the cropped scenario
+# --------------------------------------------------
+def crop_net(net_file, keep, out_dir):
+    edge_list = out_dir / "keep_edges.txt"
+    edge_list.write_text("\n".join(sorted(keep)) + "\n")
+    out = out_dir / "net.net.xml"
+
+    netconvert = shutil.which("netconvert")
+    if netconvert is None and os.environ.get("SUMO_HOME"):
+        netconvert = str(Path(os.environ["SUMO_HOME"]) / "bin" / "netconvert")
+    if netconvert is None or not Path(netconvert).exists():
+        raise SystemExit(f"netconvert not found; run it yourself with "
+                         f"--keep-edges.input-file {edge_list}")
+
+    subprocess.run([
+        netconvert,
+        "--sumo-net-file", str(net_file),
+        "--keep-edges.input-file", str(edge_list),
+        "--output-file", str(out),
+        "--no-warnings",
+    ], check=True)
+    return out
+
+
+def crop_routes(route_file, selected, out):
+    tree = ET.parse(route_file)
+    root = tree.getroot()
+    for el in list(root):
+        if el.tag == "route" and el.get("id") not in selected:
+            root.remove(el)
+        elif el.tag in ("vehicle", "flow") and el.get("route") not in selected:
+            root.remove(el)
+    tree.write(out, encoding="UTF-8", xml_declaration=True)
+
+
+STOP_TAGS = ("busStop", "trainStop")
+
+
+def kept_stop_ids(add_files, keep):
+    """Stops (from any additional file) whose lane survives the crop."""
+    return {el.get("id")
+            for path in add_files
+            for el in ET.parse(path).getroot()
+            if el.tag in STOP_TAGS and lane_edge(el.get("lane")) in keep}
+
+
+def crop_additional(add_file, keep, kept_stops, selected, out):
+    """Drop stops, accesses and person flows that reference removed edges,
+    stops or lines."""
+    tree = ET.parse(add_file)
+    root = tree.getroot()
+
+    for el in list(root):
+        if el.tag in STOP_TAGS:
+            if el.get("id") not in kept_stops:
+                root.remove(el)
+                continue
+            for access in list(el.findall("access")):
+                if lane_edge(access.get("lane")) not in keep:
+                    el.remove(access)
+
+    for el in list(root):
+        if el.tag not in ("person", "personFlow"):
+            continue
+        edges = [c.get("value") for c in el if c.tag in ("fromEdge", "toEdge")]
+        edges += [e for c in el for e in (c.get("from"), c.get("to"), c.get("edges")) if e]
+        stops = [c.get("busStop") for c in el if c.get("busStop")]
+        lines = [line for c in el if c.tag == "ride"
+                 for line in (c.get("lines") or "").split()]
+        ok = (all(e in keep for e in " ".join(edges).split())
+              and all(s in kept_stops for s in stops)
+              and all(line in selected for line in lines))
+        if not ok:
+            root.remove(el)
+
+    tree.write(out, encoding="UTF-8", xml_declaration=True)
+
+
+def write_config(src_root, src_dir, out_dir, net, routes, additionals):
+    """Same options as the source config, pointed at the cropped files
+    (which sit next to it in ``out_dir``)."""
+    root = ET.fromstring(ET.tostring(src_root))
+    inp = root.find("input")
+    inp.find("net-file").set("value", net.name)
+    if inp.find("route-files") is not None:
+        inp.find("route-files").set("value", ",".join(p.name for p in routes))
+    if inp.find("additional-files") is not None:
+        inp.find("additional-files").set("value", ",".join(p.name for p in additionals))
+
+    # Outputs keep pointing at the same place as before
+    for el in root.findall("output/*"):
+        target = (src_dir / el.get("value")).resolve()
+        el.set("value", os.path.relpath(target, out_dir.resolve()))
+
+    cfg = out_dir / "simulation.sumocfg"
+    ET.ElementTree(root).write(cfg, encoding="UTF-8", xml_declaration=True)
+    return cfg
+
+
+def cache_key(selected, buffer_m, files):
+    h = hashlib.sha1()
+    h.update(",".join(sorted(selected)).encode())
+    h.update(f"{buffer_m:.1f}".encode())
+    for path in files:
+        h.update(Path(path).read_bytes())
+    return f"routes_{'_'.join(sorted(selected))}-{buffer_m:g}m-{h.hexdigest()[:8]}"
+
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+def crop(cfg=SUMO_CFG, routes=DEFAULT_ROUTES, buffer_m=DEFAULT_BUFFER_M,
+         cache_dir=CACHE_DIR, force=False):
+    """Build (or reuse) the cropped scenario and return its .sumocfg."""
+    cfg = Path(cfg)
+    src_root, net_file, route_files, add_files = read_config(cfg)
+    selected = resolve_routes(route_files, routes)
+    print("Selected SUMO routes:", sorted(selected))
+
+    out_dir = Path(cache_dir) / cache_key(selected, buffer_m,
+                                          [cfg, net_file, *route_files, *add_files])
+    out_cfg = out_dir / "simulation.sumocfg"
+    if out_cfg.exists() and not force:
+        print("✅ Using cached crop:", out_cfg)
+        return out_cfg
+
+    route_edges = []
+    for path in route_files:
+        for el in ET.parse(path).getroot().iter("route"):
+            if el.get("id") in selected:
+                route_edges += el.get("edges").split()
+
+    print("Reading network shapes...")
+    shapes = read_edge_shapes(net_file)
+    keep = corridor_edges(shapes, route_edges, buffer_m)
+    print(f"Keeping {len(keep)} of {len(shapes)} edges within {buffer_m:g} m")
+
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    print("Cropping network...")
+    net = crop_net(net_file, keep, tmp)
+
+    print("Rewriting routes and additionals...")
+    new_routes = []
+    for path in route_files:
+        crop_routes(path, selected, tmp / path.name)
+        new_routes.append(tmp / path.name)
+    kept_stops = kept_stop_ids(add_files, keep)
+    new_adds = []
+    for path in add_files:
+        crop_additional(path, keep, kept_stops, selected, tmp / path.name)
+        new_adds.append(tmp / path.name)
+
+    # tmp is a sibling of out_dir, so relative output paths stay valid
+    write_config(src_root, cfg.parent, tmp, net, new_routes, new_adds)
+
+    # Only a complete crop ever appears under the cache key
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    print("✅ Cropped scenario written to", out_cfg)
+    return out_cfg
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Crop the SUMO scenario to the corridor of selected routes.")
+    parser.add_argument("--routes", nargs="+", default=DEFAULT_ROUTES,
+                        help="SUMO route ids or GTFS short names")
+    parser.add_argument("--buffer", type=float, default=DEFAULT_BUFFER_M,
+                        help="keep edges within this many metres of the routes")
+    parser.add_argument("--cfg", type=Path, default=SUMO_CFG)
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild even if cached")
+    args = parser.parse_args()
+
+    crop(args.cfg, args.routes, args.buffer, args.cache_dir, args.force)
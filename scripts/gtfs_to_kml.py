@@ -1,66 +1,85 @@
-import pandas as pd
-import simplekml
+import argparse
 from pathlib import Path
 
-BASE = Path("../data/filtered_gtfs")
-OUT = Path("../outputs/filtered_routes.kml")
+ROOT = Path(__file__).resolve().parent.parent
+BASE = ROOT / "data" / "filtered_gtfs"
+OUT = ROOT / "outputs" / "filtered_routes.kml"
 
-print("Loading filtered GTFS...")
 
-routes = pd.read_csv(BASE / "routes.txt")
-trips = pd.read_csv(BASE / "trips.txt")
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export the filtered GTFS routes and stops as KML.")
+    parser.add_argument("--gtfs", type=Path, default=BASE)
+    parser.add_argument("--out", type=Path, default=OUT)
+    args = parser.parse_args(argv)
+    gtfs = args.gtfs
+    out = args.out
 
-shapes = None
-if (BASE / "shapes.txt").exists():
-    shapes = pd.read_csv(BASE / "shapes.txt")
+    # Imported after argument parsing so --help stays instant
+    import pandas as pd
+    import simplekml
 
-stops = pd.read_csv(BASE / "stops.txt")
+    print("Loading filtered GTFS...")
 
-kml = simplekml.Kml()
+    routes = pd.read_csv(gtfs / "routes.txt")
+    trips = pd.read_csv(gtfs / "trips.txt")
 
-# -------------------------------------------------
-# Draw ROUTE SHAPES (polylines)
-# -------------------------------------------------
-if shapes is not None and "shape_id" in trips.columns:
+    shapes = None
+    if (gtfs / "shapes.txt").exists():
+        shapes = pd.read_csv(gtfs / "shapes.txt")
 
-    print("Building shape lines...")
+    stops = pd.read_csv(gtfs / "stops.txt")
 
-    for shape_id, group in shapes.groupby("shape_id"):
-        group = group.sort_values("shape_pt_sequence")
+    kml = simplekml.Kml()
 
-        coords = list(zip(group.shape_pt_lon, group.shape_pt_lat))
+    # -------------------------------------------------
+    # Draw ROUTE SHAPES (polylines)
+    # -------------------------------------------------
+    if shapes is not None and "shape_id" in trips.columns:
 
-        # find route name from trips → routes
-        trip_row = trips[trips["shape_id"] == shape_id].iloc[0]
-        route_id = trip_row["route_id"]
-        route_name = routes[routes["route_id"] == route_id].iloc[0]["route_short_name"]
+        print("Building shape lines...")
 
-        line = kml.newlinestring(
-            name=f"Route {route_name}",
-            coords=coords
-        )
+        for shape_id, group in shapes.groupby("shape_id"):
+            group = group.sort_values("shape_pt_sequence")
+
+            coords = list(zip(group.shape_pt_lon, group.shape_pt_lat))
+
+            # find route name from trips → routes
+            trip_row = trips[trips["shape_id"] == shape_id].iloc[0]
+            route_id = trip_row["route_id"]
+            route_name = routes[routes["route_id"] == route_id].iloc[0]["route_short_name"]
+
+            line = kml.newlinestring(
+                name=f"Route {route_name}",
+                coords=coords
+            )
 
-        line.style.linestyle.width = 4
+            line.style.linestyle.width = 4
 
-print("Shapes added")
+    print("Shapes added")
+
+    # -------------------------------------------------
+    # Add STOPS (points)
+    # -------------------------------------------------
+    print("Adding stops...")
+
+    for _, stop in stops.iterrows():
+        pnt = kml.newpoint(
+            name=str(stop["stop_name"]),
+            coords=[(stop["stop_lon"], stop["stop_lat"])]
+        )
+        pnt.style.iconstyle.scale = 0.8
 
-# -------------------------------------------------
-# Add STOPS (points)
-# -------------------------------------------------
-print("Adding stops...")
+    print("Stops added")
 
-for _, stop in stops.iterrows():
-    pnt = kml.newpoint(
-        name=str(stop["stop_name"]),
-        coords=[(stop["stop_lon"], stop["stop_lat"])]
-    )
-    pnt.style.iconstyle.scale = 0.8
+    # -------------------------------------------------
+    # Save KML
+    # -------------------------------------------------
+    out.parent.mkdir(parents=True, exist_ok=True)
+    kml.save(str(out))
 
-print("Stops added")
+    print("✅ KML created at:", out)
 
-# -------------------------------------------------
-# Save KML
-# -------------------------------------------------
-kml.save(str(OUT))
 
-print("✅ KML created at:", OUT)
+if __name__ == "__main__":
+    main()
@@ -1,95 +1,114 @@
-import pandas as pd
-import simplekml
+import argparse
 from pathlib import Path
 
-BASE = Path("../data/filtered_gtfs")
-OUT = Path("../outputs/filtered_routes.kml")
+ROOT = Path(__file__).resolve().parent.parent
+BASE = ROOT / "data" / "filtered_gtfs"
+OUT = ROOT / "outputs" / "filtered_routes.kml"
 
-print("Loading filtered GTFS...")
 
-routes = pd.read_csv(BASE / "routes.txt")
-trips = pd.read_csv(BASE / "trips.txt")
-stops = pd.read_csv(BASE / "stops.txt")
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export the filtered GTFS routes (one colour per route) and stops as KML.")
+    parser.add_argument("--gtfs", type=Path, default=BASE)
+    parser.add_argument("--out", type=Path, default=OUT)
+    args = parser.parse_args(argv)
+    gtfs = args.gtfs
+    out = args.out
 
-shapes = None
-if (BASE / "shapes.txt").exists():
-    shapes = pd.read_csv(BASE / "shapes.txt")
+    # Imported after argument parsing so --help stays instant
+    import pandas as pd
+    import simplekml
 
-kml = simplekml.Kml()
+    print("Loading filtered GTFS...")
 
-# -----------------------------------------
-# Build route_id → color map
-# -----------------------------------------
-COLOR_LIST = [
-    simplekml.Color.red,
-    simplekml.Color.blue,
-    simplekml.Color.green,
-    simplekml.Color.orange,
-    simplekml.Color.purple,
-    simplekml.Color.cyan,
-]
+    routes = pd.read_csv(gtfs / "routes.txt")
+    trips = pd.read_csv(gtfs / "trips.txt")
+    stops = pd.read_csv(gtfs / "stops.txt")
 
-route_ids = routes["route_id"].unique()
-route_color = {
-    rid: COLOR_LIST[i % len(COLOR_LIST)]
-    for i, rid in enumerate(route_ids)
-}
+    shapes = None
+    if (gtfs / "shapes.txt").exists():
+        shapes = pd.read_csv(gtfs / "shapes.txt")
 
-# -----------------------------------------
-# Draw ROUTE SHAPES grouped by route
-# -----------------------------------------
-if shapes is not None and "shape_id" in trips.columns:
+    kml = simplekml.Kml()
 
-    print("Building colored route lines...")
+    # -----------------------------------------
+    # Build route_id → color map
+    # -----------------------------------------
+    COLOR_LIST = [
+        simplekml.Color.red,
+        simplekml.Color.blue,
+        simplekml.Color.green,
+        simplekml.Color.orange,
+        simplekml.Color.purple,
+        simplekml.Color.cyan,
+    ]
 
-    for route_id in route_ids:
+    route_ids = routes["route_id"].unique()
+    route_color = {
+        rid: COLOR_LIST[i % len(COLOR_LIST)]
+        for i, rid in enumerate(route_ids)
+    }
 
-        route_name = routes[routes["route_id"] == route_id].iloc[0]["route_short_name"]
-        color = route_color[route_id]
+    # -----------------------------------------
+    # Draw ROUTE SHAPES grouped by route
+    # -----------------------------------------
+    if shapes is not None and "shape_id" in trips.columns:
 
-        folder = kml.newfolder(name=f"Route {route_name}")
+        print("Building colored route lines...")
 
-        route_trips = trips[trips["route_id"] == route_id]
+        for route_id in route_ids:
 
-        for shape_id in route_trips["shape_id"].dropna().unique():
+            route_name = routes[routes["route_id"] == route_id].iloc[0]["route_short_name"]
+            color = route_color[route_id]
 
-            group = shapes[shapes["shape_id"] == shape_id] \
-                        .sort_values("shape_pt_sequence")
+            folder = kml.newfolder(name=f"Route {route_name}")
 
-            coords = list(zip(group.shape_pt_lon, group.shape_pt_lat))
+            route_trips = trips[trips["route_id"] == route_id]
 
-            if len(coords) < 2:
-                continue
+            for shape_id in route_trips["shape_id"].dropna().unique():
 
-            line = folder.newlinestring(
-                name=f"{route_name} shape {shape_id}",
-                coords=coords
-            )
+                group = shapes[shapes["shape_id"] == shape_id] \
+                            .sort_values("shape_pt_sequence")
 
-            line.style.linestyle.width = 5
-            line.style.linestyle.color = color
+                coords = list(zip(group.shape_pt_lon, group.shape_pt_lat))
 
-print("Shapes added")
+                if len(coords) < 2:
+                    continue
 
-# -----------------------------------------
-# Add STOPS (single folder)
-# -----------------------------------------
-print("Adding stops...")
+                line = folder.newlinestring(
+                    name=f"{route_name} shape {shape_id}",
+                    coords=coords
+                )
 
-stop_folder = kml.newfolder(name="Stops")
+                line.style.linestyle.width = 5
+                line.style.linestyle.color = color
 
-for _, stop in stops.iterrows():
-    pnt = stop_folder.newpoint(
-        name=str(stop["stop_name"]),
-        coords=[(stop["stop_lon"], stop["stop_lat"])]
-    )
-    pnt.style.iconstyle.scale = 0.8
+    print("Shapes added")
 
-print("Stops added")
+    # -----------------------------------------
+    # Add STOPS (single folder)
+    # -----------------------------------------
+    print("Adding stops...")
 
-# -----------------------------------------
-# Save
-# -----------------------------------------
-kml.save(str(OUT))
+    stop_folder = kml.newfolder(name="Stops")
 
-print("✅ Colored KML created at:", OUT)
+    for _, stop in stops.iterrows():
+        pnt = stop_folder.newpoint(
+            name=str(stop["stop_name"]),
+            coords=[(stop["stop_lon"], stop["stop_lat"])]
+        )
+        pnt.style.iconstyle.scale = 0.8
+
+    print("Stops added")
+
+    # -----------------------------------------
+    # Save
+    # -----------------------------------------
+    out.parent.mkdir(parents=True, exist_ok=True)
+    kml.save(str(out))
+
+    print("✅ Colored KML created at:", out)
+
+
+if __name__ == "__main__":
+    main()
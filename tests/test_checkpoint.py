@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+from drl.checkpoint import Checkpointer
+from drl.dqn_agent import DQNAgent
+from drl.recorder import EpisodeRecorder
+
+
+def save(directory, episodes):
+    checkpointer = Checkpointer(str(directory))
+    for ep in episodes:
+        checkpointer.save(DQNAgent(), ep)
+        checkpointer.wait()
+    return checkpointer
+
+
+def test_keeps_the_most_recent_checkpoints(tmp_path):
+    save(tmp_path, [0, 10, 20])
+    assert sorted(d for d in os.listdir(tmp_path) if d.startswith("ep_")) == [
+        "ep_00010", "ep_00020"]
+
+
+def test_fresh_run_keeps_its_checkpoint_over_older_later_episodes(tmp_path):
+    save(tmp_path, [0, 10, 20])
+    checkpointer = save(tmp_path, [0])
+
+    assert checkpointer.latest() == os.path.join(str(tmp_path), "ep_00000")
+    assert sorted(d for d in os.listdir(tmp_path) if d.startswith("ep_")) == [
+        "ep_00000", "ep_00020"]
+    assert checkpointer.load(DQNAgent()) == 1
+
+    save(tmp_path, [10])
+    assert sorted(d for d in os.listdir(tmp_path) if d.startswith("ep_")) == [
+        "ep_00000", "ep_00010"]
+
+
+def test_load_rolls_the_recording_back(tmp_path):
+    recorder = EpisodeRecorder(str(tmp_path / "traces"), obs_dim=4, num_stops=2,
+                               num_vehicles=3, chunk_size=50)
+    raw = {"sim_time": 0.0, "stop_waiting": np.zeros(2), "bus_positions": np.zeros(3)}
+    for ep in range(3):
+        recorder.begin_episode(np.ones(4))
+        recorder.record(0, 1.0, np.ones(4), True, raw)
+        if ep == 0:
+            checkpointer = Checkpointer(str(tmp_path / "checkpoints"))
+            checkpointer.save(DQNAgent(), ep, recording=recorder.mark())
+            checkpointer.wait()
+    recorder.close()
+
+    recorder = EpisodeRecorder(str(tmp_path / "traces"), obs_dim=4, num_stops=2,
+                               num_vehicles=3, chunk_size=50, append=True)
+    assert checkpointer.load(DQNAgent(), recorder=recorder) == 1
+    assert recorder.episode == 0
+    assert recorder.num_steps == 1
@@ -0,0 +1,73 @@
+import numpy as np
+
+from drl.recorder import EpisodeRecorder, TraceDataset
+from drl.replay_buffer import ReplayBuffer
+
+OBS_DIM = 4
+RAW = {"sim_time": 0.0, "stop_waiting": np.zeros(2), "bus_positions": np.zeros(3)}
+
+
+def make_recorder(directory, append=False):
+    return EpisodeRecorder(str(directory), obs_dim=OBS_DIM, num_stops=2,
+                           num_vehicles=3, chunk_size=50, append=append)
+
+
+def record_episode(recorder, steps, finish=True):
+    recorder.begin_episode(np.ones(OBS_DIM))
+    for t in range(steps):
+        done = finish and t == steps - 1
+        recorder.record(t % 27, 1.0, np.full(OBS_DIM, t + 2.0), done, RAW)
+
+
+def test_append_after_crash_drops_unfinished_step(tmp_path):
+    # Crash 60 steps into an episode: only the first chunk (50 rows) is on disk
+    record_episode(make_recorder(tmp_path), 60, finish=False)
+
+    recorder = make_recorder(tmp_path, append=True)
+    record_episode(recorder, 10)
+    recorder.close()
+
+    data = TraceDataset(str(tmp_path))
+    assert len(data) == 60
+    assert list(np.flatnonzero(~data.valid)) == [49]
+
+    buffer = data.fill_replay_buffer(ReplayBuffer(capacity=100))
+    assert len(buffer) == 59
+    assert (buffer.next_states[:len(buffer)] != 0).all(axis=1).all()
+    assert buffer.dones[:len(buffer)].sum() == 1
+
+    batches = list(data.iter_batches(16, seed=0))
+    assert sum(len(batch[1]) for batch in batches) == 59
+
+
+def test_complete_episodes_are_all_valid(tmp_path):
+    recorder = make_recorder(tmp_path)
+    record_episode(recorder, 30)
+    record_episode(recorder, 30)
+    recorder.close()
+
+    data = TraceDataset(str(tmp_path))
+    assert data.valid.all()
+    _, _, _, next_states, dones = data.transitions(np.arange(len(data)))
+    assert (next_states[[29, 59]] == 31.0).all()
+    assert list(np.flatnonzero(dones)) == [29, 59]
+
+
+def test_rollback_drops_episodes_recorded_after_the_mark(tmp_path):
+    recorder = make_recorder(tmp_path)
+    record_episode(recorder, 30)
+    mark = recorder.mark()
+    record_episode(recorder, 30)
+    record_episode(recorder, 30)
+    recorder.close()
+
+    # Resuming from the checkpoint replays the last two episodes
+    recorder = make_recorder(tmp_path, append=True)
+    recorder.rollback(mark)
+    record_episode(recorder, 20)
+    recorder.close()
+
+    data = TraceDataset(str(tmp_path))
+    assert len(data) == 50
+    assert list(np.unique(data.episode)) == [0, 1]
+    assert data.valid.all()